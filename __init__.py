@@ -16,18 +16,22 @@ bl_info = {
 import bpy
 
 # Import all the modules that contain your classes
-from . import properties
-from .operators import view_navigator, op_3d, sketch_tools, reference_manager, feature_manager
+from . import properties, profiling
+from .operators import view_navigator, regeneration, op_3d, snap_index, sketch_tools, reference_manager, feature_manager, profile_ops
 from .ui import panel, draw_handlers
 
 # A list of all modules that have their own register() functions
 modules = [
     properties,
+    profiling,
     view_navigator,
+    regeneration,
     op_3d,
+    snap_index,
     sketch_tools,
     reference_manager,
     feature_manager,
+    profile_ops,
     panel,
     draw_handlers,
 ]
@@ -0,0 +1,268 @@
+# --- File: benchmarks/bench_cad.py ---
+"""Headless benchmarks for the 3D operators and the sketch geometry helpers.
+
+Run with Blender from anywhere; the add-on is loaded from this checkout:
+
+    blender -b --factory-startup --python benchmarks/bench_cad.py -- --output results.json
+
+Options after "--":
+    --output PATH   write the JSON report to PATH instead of stdout
+    --repeat N      timed runs per case (default 3); min and median are reported
+    --quick         skip the largest mesh and polyline sizes
+"""
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+import bpy
+import bmesh
+from mathutils import Vector
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_NAME = "cad_tools_bench"
+
+# UV sphere segment counts; faces = segments * segments / 2
+MESH_SEGMENTS = (16, 64, 256)
+POLYLINE_POINTS = (10, 100, 1000, 10000, 100000)
+GEAR_TEETH = (12, 48, 200)
+
+
+def load_addon():
+    """Imports the add-on from ADDON_DIR under its own name and registers it."""
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"), submodule_search_locations=[ADDON_DIR],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = module
+    spec.loader.exec_module(module)
+    module.register()
+    return module
+
+
+def clear_scene():
+    """Removes every object, collection and mesh so each run starts from the same state."""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+    bpy.context.scene.cursor.location = (0, 0, 0)
+
+
+def make_target(segments):
+    """Adds a UV sphere of radius 1 with the given segment count and makes it the active, selected object."""
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=segments, v_segments=max(segments // 2, 3), radius=1.0)
+    mesh = bpy.data.meshes.new("Bench_Target")
+    bm.to_mesh(mesh)
+    bm.free()
+    obj = bpy.data.objects.new("Bench_Target", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    return obj
+
+
+def measure(setup, run, repeat):
+    """Times run(setup()) repeat times. Returns the timing summary and the last run's result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        clear_scene()
+        state = setup()
+        start = time.perf_counter()
+        result = run(state)
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "runs": times,
+    }, result
+
+
+# --- 3D operator cases ---
+
+def _operator_case(name, call, prepare=None):
+    """Returns a case that runs call() on a fresh target sphere of each size."""
+    def run_case(repeat, sizes):
+        results = []
+        for segments in sizes:
+            def setup():
+                obj = make_target(segments)
+                if prepare:
+                    prepare(obj)
+                return obj
+
+            def run(obj):
+                status = call()
+                return status, len(obj.data.polygons)
+
+            timing, (status, faces_after) = measure(setup, run, repeat)
+            results.append({
+                "name": name,
+                "params": {"segments": segments, "faces": segments * max(segments // 2, 3)},
+                "seconds": timing,
+                "status": sorted(status),
+                "faces_after": faces_after,
+            })
+        return results
+    return run_case
+
+
+def _cursor_on_top(obj):
+    bpy.context.scene.cursor.location = (0, 0, 1)
+
+
+def run_gear_cases(repeat, teeth_counts):
+    results = []
+    for teeth in teeth_counts:
+        for flank_samples in (8, 32):
+            def run(_state, teeth=teeth, flank_samples=flank_samples):
+                return bpy.ops.mesh.create_gear(num_teeth=teeth, flank_samples=flank_samples)
+
+            timing, status = measure(lambda: None, run, repeat)
+            results.append({
+                "name": "create_gear",
+                "params": {"num_teeth": teeth, "flank_samples": flank_samples},
+                "seconds": timing,
+                "status": sorted(status),
+            })
+    return results
+
+
+OPERATOR_CASES = (
+    _operator_case("create_hole", lambda: bpy.ops.mesh.create_hole(), _cursor_on_top),
+    _operator_case("simple_extrude", lambda: bpy.ops.mesh.simple_extrude(extrude_depth=0.1)),
+    _operator_case("bevel_edges", lambda: bpy.ops.mesh.bevel_edges(bevel_amount=0.005, bevel_segments=2)),
+    _operator_case("inner_radius", lambda: bpy.ops.mesh.inner_radius()),
+)
+
+
+# --- Sketch helper cases ---
+
+def make_sketch_host(addon):
+    """Returns an object carrying SKETCH_OT_draw_line's geometry helpers.
+
+    Registered operator classes cannot be instantiated outside an operator
+    call, so the helpers are bound to a plain class instead.
+    """
+    operator = addon.operators.sketch_tools.SKETCH_OT_draw_line
+    members = {
+        name: getattr(operator, name)
+        for name in ("sketch_flush_interval", "_add_edge_to_object", "_get_sketch_buffer", "_create_face_from_points")
+    }
+    return type("SketchHost", (), members)()
+
+
+def polyline(count):
+    """Returns count points on a circle spaced 1 cm apart, well above the sketch's coincidence tolerance."""
+    radius = max(count * 0.01 / (2 * math.pi), 0.05)
+    step = 2 * math.pi / count
+    return [Vector((math.cos(i * step) * radius, math.sin(i * step) * radius, 0)) for i in range(count)]
+
+
+def new_sketch_object():
+    obj = bpy.data.objects.new("Bench_Sketch", bpy.data.meshes.new("Bench_Sketch"))
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def run_sketch_cases(addon, repeat, point_counts):
+    results = []
+    context = bpy.context
+    for count in point_counts:
+        points = polyline(count)
+
+        def setup():
+            host = make_sketch_host(addon)
+            host.sketch_buffer = None
+            return host, new_sketch_object()
+
+        def add_edges(state):
+            host, obj = state
+            for p1, p2 in zip(points, points[1:] + points[:1]):
+                host._add_edge_to_object(context, obj, p1, p2)
+            # What the operator's cleanup does when drawing ends
+            if host.sketch_buffer and host.sketch_buffer.pending_edges:
+                host.sketch_buffer.flush()
+            return len(obj.data.edges)
+
+        timing, edges = measure(setup, add_edges, repeat)
+        results.append({
+            "name": "sketch_add_edge_to_object",
+            "params": {"points": count},
+            "seconds": timing,
+            "edges": edges,
+        })
+
+        def create_face(state):
+            host, obj = state
+            host._create_face_from_points(context, obj, points)
+            return len(obj.data.polygons)
+
+        timing, faces = measure(setup, create_face, repeat)
+        results.append({
+            "name": "sketch_create_face_from_points",
+            "params": {"points": count},
+            "seconds": timing,
+            "faces": faces,
+        })
+    return results
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="bench_cad.py")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    addon = load_addon()
+    mesh_sizes = MESH_SEGMENTS[:-1] if args.quick else MESH_SEGMENTS
+    point_counts = POLYLINE_POINTS[:-1] if args.quick else POLYLINE_POINTS
+    gear_teeth = GEAR_TEETH[:-1] if args.quick else GEAR_TEETH
+
+    results = []
+    try:
+        for case in OPERATOR_CASES:
+            results.extend(case(args.repeat, mesh_sizes))
+        results.extend(run_gear_cases(args.repeat, gear_teeth))
+        results.extend(run_sketch_cases(addon, args.repeat, point_counts))
+    finally:
+        clear_scene()
+        addon.unregister()
+
+    report = {
+        "meta": {
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "addon_dir": ADDON_DIR,
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"Wrote {len(results)} benchmark results to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 # --- __init__.py for operators package ---
+from . import mesh_ops
+from . import regeneration
 from . import op_3d
+from . import snap_index
 from . import sketch_tools
 from . import view_navigator
 from . import feature_manager
+from . import profile_ops
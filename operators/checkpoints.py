@@ -0,0 +1,199 @@
+# --- File: operators/checkpoints.py ---
+from collections import OrderedDict
+import numpy as np
+
+
+# Attributes MeshSnapshot stores in its own arrays (or that Blender derives from them)
+_TOPOLOGY_ATTRIBUTES = {"position", ".edge_verts", ".corner_vert", ".corner_edge", "material_index"}
+
+# data_type -> (foreach key, components per element, NumPy dtype)
+_ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int8),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT2': ("vector", 2, np.float32),
+    'INT32_2D': ("vector", 2, np.int32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'QUATERNION': ("value", 4, np.float32),
+    'FLOAT4X4': ("value", 16, np.float32),
+}
+
+
+class MeshSnapshot:
+    """Flat NumPy copy of a mesh: vertex positions, edges, face loops, material indices and attributes.
+
+    attributes holds (name, domain, data_type, values) for every other mesh
+    attribute, such as UV maps, sharp_face, seams and creases, so a mesh
+    restored from a snapshot matches the one it was taken from.
+    """
+
+    __slots__ = ("co", "edges", "loops", "loop_starts", "material_indices", "loop_edges", "attributes")
+
+    def __init__(self, co, edges, loops, loop_starts, material_indices, loop_edges=None, attributes=()):
+        self.co = co
+        self.edges = edges
+        self.loops = loops
+        self.loop_starts = loop_starts
+        self.material_indices = material_indices
+        # Without the edge of every loop, restore() recalculates the edges
+        self.loop_edges = np.empty(0, dtype=np.int32) if loop_edges is None else loop_edges
+        self.attributes = tuple(attributes)
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        loops = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loops)
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        material_indices = np.empty(len(mesh.polygons), dtype=np.int16)
+        mesh.polygons.foreach_get("material_index", material_indices)
+        loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", loop_edges)
+
+        sizes = {'POINT': len(mesh.vertices), 'EDGE': len(mesh.edges), 'FACE': len(mesh.polygons), 'CORNER': len(mesh.loops)}
+        attributes = []
+        for attribute in mesh.attributes:
+            layout = _ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+            if attribute.name in _TOPOLOGY_ATTRIBUTES or layout is None or attribute.domain not in sizes:
+                continue
+            key, components, dtype = layout
+            values = np.empty(sizes[attribute.domain] * components, dtype=dtype)
+            attribute.data.foreach_get(key, values)
+            attributes.append((attribute.name, attribute.domain, attribute.data_type, values))
+        return cls(co, edges, loops, loop_starts, material_indices, loop_edges, attributes)
+
+    def instanced(self, linear, offsets):
+        """Returns one snapshot holding a copy of this one per offset.
+
+        Every copy is transformed by the same 3x3 linear part and then moved
+        by its own row of offsets, all in a single array operation.
+        """
+        offsets = np.asarray(offsets, dtype=np.float32).reshape(-1, 3)
+        count = len(offsets)
+        num_verts = len(self.co) // 3
+        co = self.co.reshape(-1, 3) @ np.asarray(linear, dtype=np.float32).T
+        co = (co[None, :, :] + offsets[:, None, :]).reshape(-1)
+
+        vert_shift = (np.arange(count, dtype=np.int32) * num_verts)[:, None]
+        edge_shift = (np.arange(count, dtype=np.int32) * (len(self.edges) // 2))[:, None]
+        loop_shift = (np.arange(count, dtype=np.int32) * len(self.loops))[:, None]
+        # Every domain grows by the same factor, so attribute values are simply repeated
+        return MeshSnapshot(
+            co.astype(np.float32),
+            (self.edges[None, :] + vert_shift).reshape(-1),
+            (self.loops[None, :] + vert_shift).reshape(-1),
+            (self.loop_starts[None, :] + loop_shift).reshape(-1),
+            np.tile(self.material_indices, count),
+            (self.loop_edges[None, :] + edge_shift).reshape(-1),
+            [(name, domain, data_type, np.tile(values, count)) for name, domain, data_type, values in self.attributes],
+        )
+
+    @property
+    def nbytes(self):
+        arrays = (self.co, self.edges, self.loops, self.loop_starts, self.material_indices, self.loop_edges)
+        return sum(a.nbytes for a in arrays) + sum(values.nbytes for _, _, _, values in self.attributes)
+
+    def restore(self, mesh):
+        """Replaces the geometry of mesh with the snapshot."""
+        mesh.clear_geometry()
+        mesh.vertices.add(len(self.co) // 3)
+        mesh.vertices.foreach_set("co", self.co)
+        mesh.edges.add(len(self.edges) // 2)
+        mesh.edges.foreach_set("vertices", self.edges)
+        mesh.loops.add(len(self.loops))
+        mesh.loops.foreach_set("vertex_index", self.loops)
+        mesh.polygons.add(len(self.loop_starts))
+        mesh.polygons.foreach_set("loop_start", self.loop_starts)
+        mesh.polygons.foreach_set("material_index", self.material_indices)
+        if len(self.edges) and len(self.loop_edges) == len(self.loops):
+            # Edges stay in their stored order, so edge attributes still line up
+            mesh.loops.foreach_set("edge_index", self.loop_edges)
+            mesh.update()
+        else:
+            mesh.update(calc_edges=True)
+
+        for name, domain, data_type, values in self.attributes:
+            attribute = mesh.attributes.get(name)
+            if attribute is not None and (attribute.domain != domain or attribute.data_type != data_type):
+                mesh.attributes.remove(attribute)
+                attribute = None
+            if attribute is None:
+                attribute = mesh.attributes.new(name, data_type, domain)
+            attribute.data.foreach_set(_ATTRIBUTE_LAYOUTS[data_type][0], values)
+
+
+class CheckpointStore:
+    """Per-feature mesh snapshots with least-recently-used eviction.
+
+    Snapshots are keyed on (object session_uid, feature index). When the
+    total size goes over the memory budget the least recently used
+    snapshots are dropped; a rebuild then starts from the closest earlier
+    snapshot that is still resident. Each object also has an inputs key for
+    everything outside its feature tree that the snapshots depend on; see
+    check_inputs().
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.snapshots = OrderedDict() # (uid, index) -> MeshSnapshot, oldest first
+        self.indices = {} # uid -> set of resident feature indices
+        self.inputs = {} # uid -> inputs key the resident snapshots were taken with
+        self.nbytes = 0
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def _evict(self):
+        while self.nbytes > self.budget_bytes and self.snapshots:
+            (uid, index), snapshot = self.snapshots.popitem(last=False)
+            self.nbytes -= snapshot.nbytes
+            self.indices[uid].discard(index)
+
+    def put(self, uid, index, mesh):
+        """Snapshots mesh as the state after feature index of object uid."""
+        self.discard(uid, index)
+        snapshot = MeshSnapshot.from_mesh(mesh)
+        self.snapshots[(uid, index)] = snapshot
+        self.indices.setdefault(uid, set()).add(index)
+        self.nbytes += snapshot.nbytes
+        self._evict()
+
+    def discard(self, uid, index):
+        snapshot = self.snapshots.pop((uid, index), None)
+        if snapshot is not None:
+            self.nbytes -= snapshot.nbytes
+            self.indices[uid].discard(index)
+
+    def latest_before(self, uid, index):
+        """Returns (i, snapshot) for the highest resident i < index, or (-1, None)."""
+        resident = [i for i in self.indices.get(uid, ()) if i < index]
+        if not resident:
+            return -1, None
+        i = max(resident)
+        self.snapshots.move_to_end((uid, i))
+        return i, self.snapshots[(uid, i)]
+
+    def check_inputs(self, uid, key):
+        """Drops every snapshot of object uid if key differs from the one they were taken with."""
+        if self.inputs.get(uid) != key:
+            self.invalidate(uid)
+            self.inputs[uid] = key
+
+    def invalidate(self, uid, from_index=0):
+        """Drops the snapshots of object uid from feature from_index onwards."""
+        for index in [i for i in self.indices.get(uid, ()) if i >= from_index]:
+            self.discard(uid, index)
+
+    def clear(self):
+        self.snapshots.clear()
+        self.indices.clear()
+        self.inputs.clear()
+        self.nbytes = 0
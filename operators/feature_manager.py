@@ -1,5 +1,8 @@
 # --- File: operators/feature_manager.py ---
 import bpy
+from . import regeneration
+from .op_3d import feature_target
+from .. import profiling
 
 class OBJECT_OT_add_feature(bpy.types.Operator):
     """Add a new feature to the active object's feature tree."""
@@ -15,6 +18,7 @@ class OBJECT_OT_add_feature(bpy.types.Operator):
         name="Feature Type"
     )
 
+    @profiling.profiled
     def execute(self, context):
         obj = context.object
         if not obj:
@@ -42,17 +46,30 @@ class OBJECT_OT_remove_feature(bpy.types.Operator):
         obj = context.object
         return obj and obj.object_cad_settings and len(obj.object_cad_settings.feature_tree) > 0
 
+    @profiling.profiled
     def execute(self, context):
         obj = context.object
         settings = obj.object_cad_settings
         index = settings.active_feature_index
 
-        # In a real implementation, we would remove the feature.
-        # For now, just a placeholder.
-        self.report({'INFO'}, f"Placeholder: Remove feature at index {index}.")
-        # Example of how it would work:
-        # settings.feature_tree.remove(index)
-        # settings.active_feature_index = min(max(0, index - 1), len(settings.feature_tree) - 1)
+        if settings.base_mesh is None:
+            self.report({'WARNING'}, "This feature tree has no base mesh, so features cannot be removed.")
+            return {'CANCELLED'}
+        if not 0 <= index < len(settings.feature_tree):
+            return {'CANCELLED'}
+
+        # Rebuild without the feature first; the tree only changes once that succeeded
+        feature_target(context, obj.name)
+        features = list(settings.feature_tree)
+        del features[index]
+        try:
+            regeneration.regenerate(obj, from_index=index, features=features)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        settings.feature_tree.remove(index)
+        settings.active_feature_index = min(max(0, index - 1), len(settings.feature_tree) - 1)
         return {'FINISHED'}
 
 
@@ -75,23 +92,66 @@ class OBJECT_OT_move_feature(bpy.types.Operator):
         obj = context.object
         return obj and obj.object_cad_settings and len(obj.object_cad_settings.feature_tree) > 1
 
+    @profiling.profiled
     def execute(self, context):
         obj = context.object
         settings = obj.object_cad_settings
         index = settings.active_feature_index
 
-        # In a real implementation, we would move the feature.
-        # For now, just a placeholder.
-        self.report({'INFO'}, f"Placeholder: Move feature {self.direction}.")
-        # Example of how it would work:
-        # if self.direction == 'UP':
-        #     if index > 0:
-        #         settings.feature_tree.move(index, index - 1)
-        #         settings.active_feature_index -= 1
-        # elif self.direction == 'DOWN':
-        #     if index < len(settings.feature_tree) - 1:
-        #         settings.feature_tree.move(index, index + 1)
-        #         settings.active_feature_index += 1
+        if settings.base_mesh is None:
+            self.report({'WARNING'}, "This feature tree has no base mesh, so features cannot be reordered.")
+            return {'CANCELLED'}
+
+        target = index - 1 if self.direction == 'UP' else index + 1
+        if not (0 <= index < len(settings.feature_tree) and 0 <= target < len(settings.feature_tree)):
+            return {'CANCELLED'}
+
+        # Rebuild in the new order first; the tree only changes once that succeeded.
+        # Everything from the upper of the two swapped features onwards has to be replayed.
+        feature_target(context, obj.name)
+        features = list(settings.feature_tree)
+        features[index], features[target] = features[target], features[index]
+        try:
+            regeneration.regenerate(obj, from_index=min(index, target), features=features)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        settings.feature_tree.move(index, target)
+        settings.active_feature_index = target
+        return {'FINISHED'}
+
+
+class OBJECT_OT_regenerate_features(bpy.types.Operator):
+    """Rebuild the object's geometry from its base mesh and feature tree."""
+    bl_idname = "object.regenerate_features"
+    bl_label = "Regenerate"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    full: bpy.props.BoolProperty(
+        name="Full Rebuild",
+        description="Replay every feature instead of starting at the active one",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return obj and obj.type == 'MESH' and obj.object_cad_settings.base_mesh is not None
+
+    @profiling.profiled
+    def execute(self, context):
+        obj = context.object
+        settings = obj.object_cad_settings
+        from_index = 0 if self.full else max(settings.active_feature_index, 0)
+        # The rebuilt mesh is written to obj.data, which edit mode would overwrite
+        feature_target(context, obj.name)
+        try:
+            replayed = regeneration.regenerate(obj, from_index=from_index)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Regenerated {replayed} feature(s).")
         return {'FINISHED'}
 
 
@@ -99,6 +159,7 @@ classes = (
     OBJECT_OT_add_feature,
     OBJECT_OT_remove_feature,
     OBJECT_OT_move_feature,
+    OBJECT_OT_regenerate_features,
 )
 
 def register():
@@ -0,0 +1,413 @@
+# --- File: operators/mesh_ops.py ---
+import bpy
+import bmesh
+import math
+import numpy as np
+from collections import OrderedDict
+from mathutils import Matrix, Vector
+from .checkpoints import MeshSnapshot
+from .. import profiling
+
+
+# Bounds for the segment count picked from a chord tolerance
+MIN_CUTTER_SEGMENTS = 8
+MAX_CUTTER_SEGMENTS = 256
+
+
+def segments_for_radius(radius, chord_tolerance, default=64):
+    """Returns the number of segments for a circle of the given radius.
+
+    The count is the smallest for which the chords stay within
+    chord_tolerance of the true circle (sagitta r * (1 - cos(pi / n))),
+    clamped to MIN_CUTTER_SEGMENTS..MAX_CUTTER_SEGMENTS. Returns default
+    when no tolerance is given.
+    """
+    if not chord_tolerance or chord_tolerance <= 0:
+        return default
+    if radius <= chord_tolerance:
+        return MIN_CUTTER_SEGMENTS
+    segments = math.ceil(math.pi / math.acos(1 - chord_tolerance / radius))
+    return max(MIN_CUTTER_SEGMENTS, min(MAX_CUTTER_SEGMENTS, segments))
+
+
+def build_hole_cutter(bm, hole_type, diameter, depth, cb_diameter, cb_depth, cs_angle, segments=64, chord_tolerance=None):
+    """Adds the cutter for a simple, counterbore or countersink hole to bm.
+
+    The cutter is built at the origin with the bore running down -Z. With a
+    chord_tolerance every cone gets its own segment count from its radius,
+    otherwise all of them use segments. Raises ValueError if the counterbore
+    is not larger than the hole.
+    """
+    if hole_type == 'COUNTERBORE' and (cb_diameter <= diameter or cb_depth <= 0):
+        raise ValueError("Counterbore dimensions must be larger than hole.")
+
+    # Main hole
+    main_segments = segments_for_radius(diameter / 2, chord_tolerance, segments)
+    cone_main = bmesh.ops.create_cone(bm, cap_ends=True, segments=main_segments, radius1=diameter / 2, radius2=diameter / 2, depth=depth)
+    bmesh.ops.translate(bm, verts=cone_main['verts'], vec=(0, 0, -depth / 2))
+
+    if hole_type == 'COUNTERBORE':
+        cb_segments = segments_for_radius(cb_diameter / 2, chord_tolerance, segments)
+        cone_cb = bmesh.ops.create_cone(bm, cap_ends=True, segments=cb_segments, radius1=cb_diameter / 2, radius2=cb_diameter / 2, depth=cb_depth)
+        bmesh.ops.translate(bm, verts=cone_cb['verts'], vec=(0, 0, cb_depth / 2))
+
+    elif hole_type == 'COUNTERSINK':
+        cs_radius = diameter / 2
+        cs_depth = cs_radius / math.tan(math.radians(cs_angle / 2))
+        cs_segments = segments_for_radius(cs_radius, chord_tolerance, segments)
+        cone_cs = bmesh.ops.create_cone(bm, cap_ends=True, segments=cs_segments, radius1=cs_radius, radius2=0, depth=cs_depth)
+        bmesh.ops.translate(bm, verts=cone_cs['verts'], vec=(0, 0, cs_depth / 2))
+
+
+def hole_pattern_positions(pattern_type, origin, count_x, count_y, spacing_x, spacing_y, radius, start_angle, points=(), axes=None):
+    """Returns the centres of a hole pattern.
+
+    LINEAR places count_x holes along X, RECTANGULAR a count_x by count_y grid,
+    POLAR count_x holes on a circle of the given radius and POINTS uses the
+    given points as they are. Patterns are laid out in the XY plane of axes
+    (a 3x3 matrix, identity if omitted) starting at origin.
+    """
+    origin = Vector(origin)
+    axes = Matrix.Identity(3) if axes is None else axes
+    if pattern_type == 'POINTS':
+        return [Vector(p) for p in points]
+    if pattern_type == 'POLAR':
+        step = 2 * math.pi / count_x
+        return [
+            origin + axes @ Vector((math.cos(start_angle + i * step) * radius, math.sin(start_angle + i * step) * radius, 0))
+            for i in range(count_x)
+        ]
+    rows = count_y if pattern_type == 'RECTANGULAR' else 1
+    return [origin + axes @ Vector((i * spacing_x, j * spacing_y, 0)) for j in range(rows) for i in range(count_x)]
+
+
+class CutterTemplateCache:
+    """Hole cutters built at the origin, kept as MeshSnapshots with LRU eviction.
+
+    Templates are keyed on the hole type, the dimensions that type uses and
+    the segment count of every cone, so a repeated standard size is only
+    built with create_cone once and then instanced.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.templates = OrderedDict() # key -> MeshSnapshot, least recently used first
+
+    def clear(self):
+        self.templates.clear()
+
+    def get(self, hole_type, diameter, depth, cb_diameter, cb_depth, cs_angle, segments=64, chord_tolerance=None):
+        """Returns the template for the given hole. Raises ValueError for invalid dimensions."""
+        key = (hole_type, round(diameter, 9), round(depth, 9), segments_for_radius(diameter / 2, chord_tolerance, segments))
+        if hole_type == 'COUNTERBORE':
+            key += (round(cb_diameter, 9), round(cb_depth, 9), segments_for_radius(cb_diameter / 2, chord_tolerance, segments))
+        elif hole_type == 'COUNTERSINK':
+            key += (round(cs_angle, 9),)
+
+        template = self.templates.get(key)
+        if template is not None:
+            self.templates.move_to_end(key)
+            return template
+
+        bm = bmesh.new()
+        mesh = bpy.data.meshes.new("CAD_Hole_Template")
+        try:
+            with profiling.phase("cutter_build"):
+                build_hole_cutter(bm, hole_type, diameter, depth, cb_diameter, cb_depth, cs_angle, segments, chord_tolerance)
+                bm.to_mesh(mesh)
+                template = MeshSnapshot.from_mesh(mesh)
+        finally:
+            bm.free()
+            bpy.data.meshes.remove(mesh)
+        self.templates[key] = template
+        while len(self.templates) > self.max_entries:
+            self.templates.popitem(last=False)
+        return template
+
+
+# Shared by the hole and hole pattern features.
+cutter_templates = CutterTemplateCache()
+
+
+@profiling.profiled
+def build_hole_pattern_cutter(axes, positions, hole_type, diameter, depth, cb_diameter, cb_depth, cs_angle, segments=64, chord_tolerance=None):
+    """Returns a MeshSnapshot with one hole cutter per position, ready for boolean_difference.
+
+    The cutter template comes from cutter_templates and is instanced with
+    NumPy; axes is the 3x3 matrix that orients each cutter and positions are
+    the hole centres, both in the target's space. Raises ValueError for
+    invalid hole dimensions.
+    """
+    template = cutter_templates.get(hole_type, diameter, depth, cb_diameter, cb_depth, cs_angle, segments, chord_tolerance)
+    return template.instanced(axes, [Vector(p) for p in positions])
+
+
+def involute_gear_outline(module, num_teeth, flank_samples=8, pressure_angle=math.radians(20)):
+    """Returns the (N, 2) outline of an involute spur gear, counter-clockwise.
+
+    One tooth is sampled along its two involute flanks from the base (or
+    root) circle to the addendum circle; the other teeth are rotated copies
+    made by broadcasting the tooth's polar angles over all tooth positions.
+    Below the base circle the flanks continue radially down to the root.
+    """
+    pitch_radius = module * num_teeth / 2
+    base_radius = pitch_radius * math.cos(pressure_angle)
+    outer_radius = pitch_radius + module
+    root_radius = pitch_radius - 1.25 * module
+
+    # Involute parameter t: radius rb * sqrt(1 + t^2), polar angle inv = t - atan(t)
+    flank_start = max(base_radius, root_radius)
+    t = np.linspace(
+        math.sqrt((flank_start / base_radius)**2 - 1),
+        math.sqrt((outer_radius / base_radius)**2 - 1),
+        max(flank_samples, 2),
+    )
+    radii = base_radius * np.sqrt(1 + t * t)
+    # Half the angular tooth thickness at each radius; the tooth is centred on angle 0
+    inv_pressure = math.tan(pressure_angle) - pressure_angle
+    half_angles = math.pi / (2 * num_teeth) + inv_pressure - (t - np.arctan(t))
+    # Small tooth counts give pointed teeth; stop the flanks where they meet
+    keep = half_angles > 0
+    radii = radii[keep]
+    half_angles = half_angles[keep]
+    if root_radius < base_radius:
+        radii = np.concatenate(([root_radius], radii))
+        half_angles = np.concatenate(([half_angles[0]], half_angles))
+
+    # Rising flank at -angle, then the falling flank at +angle back down
+    tooth_angles = np.concatenate((-half_angles, half_angles[::-1]))
+    tooth_radii = np.concatenate((radii, radii[::-1]))
+
+    angles = (tooth_angles[None, :] + (np.arange(num_teeth) * (2 * math.pi / num_teeth))[:, None]).ravel()
+    radii = np.tile(tooth_radii, num_teeth)
+    return np.column_stack((radii * np.cos(angles), radii * np.sin(angles)))
+
+
+@profiling.profiled
+def gear_snapshot(module, num_teeth, width, flank_samples=8):
+    """Returns a MeshSnapshot of a spur gear prism: the involute outline extruded by width."""
+    outline = involute_gear_outline(module, num_teeth, flank_samples)
+    count = len(outline)
+    co = np.zeros((2 * count, 3), dtype=np.float32)
+    co[:count, :2] = outline
+    co[count:, :2] = outline
+    co[count:, 2] = width
+
+    ring = np.arange(count, dtype=np.int32)
+    following = np.roll(ring, -1)
+    sides = np.column_stack((ring, following, following + count, ring + count)).ravel()
+    # Bottom cap faces down, top cap up, followed by one quad per outline edge
+    loops = np.concatenate((ring[::-1], ring + count, sides)).astype(np.int32)
+    loop_starts = np.concatenate(([0, count], 2 * count + 4 * ring)).astype(np.int32)
+    return MeshSnapshot(
+        co.ravel(),
+        np.empty(0, dtype=np.int32),
+        loops,
+        loop_starts,
+        np.zeros(len(loop_starts), dtype=np.int16),
+    )
+
+
+def build_spur_gear(bm, module, num_teeth, width, flank_samples=8):
+    """Adds an involute spur gear of the given module, tooth count and face width to bm."""
+    mesh = bpy.data.meshes.new("CAD_Gear_Scratch")
+    try:
+        gear_snapshot(module, num_teeth, width, flank_samples).restore(mesh)
+        bm.from_mesh(mesh)
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+
+class GearMeshLibrary:
+    """Spur gear meshes shared by every gear with the same parameters.
+
+    Each library mesh carries its parameter key as a custom property, so
+    gears created after reopening a file still find and link the mesh. The
+    key -> name map is built with a single scan of bpy.data.meshes on first
+    use after clear(); names are re-validated on every access and only a
+    stale name triggers another scan.
+    """
+
+    KEY_PROP = "cad_gear_key"
+
+    def __init__(self):
+        self.names = {} # key -> mesh name
+        self.scanned = False
+
+    def clear(self):
+        self.names.clear()
+        self.scanned = False
+
+    def _scan(self):
+        self.names = {mesh[self.KEY_PROP]: mesh.name for mesh in bpy.data.meshes if self.KEY_PROP in mesh}
+        self.scanned = True
+
+    @staticmethod
+    def key(module, num_teeth, width, flank_samples):
+        return f"m={module:.9g};z={num_teeth};w={width:.9g};s={flank_samples}"
+
+    def _cached(self, key):
+        mesh = bpy.data.meshes.get(self.names.get(key, ""))
+        if mesh is not None and mesh.get(self.KEY_PROP) == key:
+            return mesh
+        return None
+
+    def _find(self, key):
+        mesh = self._cached(key)
+        # A key that is simply not in the map is a new gear; no scan needed
+        if mesh is None and (not self.scanned or key in self.names):
+            self._scan()
+            mesh = self._cached(key)
+        return mesh
+
+    def get(self, module, num_teeth, width, flank_samples=8):
+        """Returns the shared gear mesh for the parameters, building it on first use."""
+        key = self.key(module, num_teeth, width, flank_samples)
+        mesh = self._find(key)
+        if mesh is None:
+            mesh = bpy.data.meshes.new("SpurGear_Mesh")
+            gear_snapshot(module, num_teeth, width, flank_samples).restore(mesh)
+            mesh[self.KEY_PROP] = key
+            self.names[key] = mesh.name
+        return mesh
+
+
+# Shared by every gear operator.
+gear_library = GearMeshLibrary()
+
+
+def encode_index_ranges(indices):
+    """Returns sorted element indices as a compact range string, e.g. [0, 1, 2, 5] -> '0-2,5'."""
+    parts = []
+    indices = sorted(set(int(i) for i in indices))
+    start = prev = None
+    for i in indices + [None]:
+        if start is not None and (i is None or i != prev + 1):
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+            start = None
+        if start is None:
+            start = i
+        prev = i
+    return ",".join(parts)
+
+
+def decode_index_ranges(text):
+    """Returns the indices of a range string made by encode_index_ranges(). Raises ValueError if malformed."""
+    indices = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        indices.extend(range(int(first), int(last or first) + 1))
+    return indices
+
+
+def selected_indices(elements):
+    """Returns the indices of the selected elements of a mesh collection (vertices, edges or polygons)."""
+    select = np.zeros(len(elements), dtype=bool)
+    elements.foreach_get("select", select)
+    return np.flatnonzero(select).tolist()
+
+
+def _lookup(seq, indices):
+    """Returns the bmesh elements at indices. Raises ValueError if the mesh has fewer elements."""
+    seq.ensure_lookup_table()
+    if indices and max(indices) >= len(seq):
+        raise ValueError("The stored selection no longer matches the mesh topology.")
+    return [seq[i] for i in indices]
+
+
+def selection_element_count(seq, indices):
+    """Returns len(seq) for a bmesh face or edge sequence that indices are stored against.
+
+    Used to tell whether stored indices still fit the mesh once upstream
+    features have rebuilt it. Raises ValueError if seq has fewer elements
+    than indices refer to.
+    """
+    _lookup(seq, indices)
+    return len(seq)
+
+
+def extrude_region(bm, offset, faces=None):
+    """Extrudes the faces at the given indices of bm by offset, or all geometry if faces is None."""
+    if faces is None:
+        geom = bm.verts[:] + bm.edges[:] + bm.faces[:]
+    else:
+        geom = _lookup(bm.faces, faces)
+    result = bmesh.ops.extrude_face_region(bm, geom=geom)
+    verts = [v for v in result['geom'] if isinstance(v, bmesh.types.BMVert)]
+    bmesh.ops.translate(bm, verts=verts, vec=offset)
+
+
+def bevel_edges(bm, offset, segments, edges=None):
+    """Bevels the edges at the given indices of bm, or all edges if edges is None."""
+    geom = bm.edges[:] if edges is None else _lookup(bm.edges, edges)
+    bmesh.ops.bevel(bm, geom=geom, offset=offset, segments=segments, profile=0.5, affect='EDGES')
+
+
+@profiling.profiled
+def bmesh_snapshot(bm):
+    """Returns a MeshSnapshot of bm."""
+    mesh = bpy.data.meshes.new("CAD_Snapshot_Scratch")
+    try:
+        bm.to_mesh(mesh)
+        return MeshSnapshot.from_mesh(mesh)
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+
+def build_inner_radius_cutter(snapshot, dimensions, wall, offset, rotation):
+    """Returns a MeshSnapshot: a copy of snapshot shrunk so the remaining walls are `wall` thick.
+
+    dimensions are the part's extents in world units, wall the (x, y, z) wall
+    thickness, offset a translation in the part's local space and rotation an
+    angle about local Z. The copy is scaled about the local origin, like
+    resizing a duplicate of the object. Raises ValueError if the walls do
+    not fit.
+    """
+    if dimensions[0] == 0 or dimensions[1] == 0 or dimensions[2] == 0:
+        raise ValueError("Object has zero dimension on one or more axes.")
+    scale = [(dimensions[i] - 2 * wall[i]) / dimensions[i] for i in range(3)]
+    if scale[0] <= 0 or scale[1] <= 0 or scale[2] <= 0:
+        raise ValueError("Wall thickness is too large for the object dimensions.")
+
+    linear = Matrix.Rotation(rotation, 3, 'Z') @ Matrix.Diagonal(scale)
+    return snapshot.instanced(linear, [offset])
+
+
+@profiling.profiled
+def boolean_difference(bm, cutter, solver='FAST'):
+    """Subtracts cutter, a BMesh or MeshSnapshot, from bm in place. Both are expected in the same space.
+
+    The boolean is evaluated in a temporary scene of its own, so the cost does
+    not depend on what else is in the user's scene and neither the selection
+    nor the active object is touched.
+    """
+    mesh = bpy.data.meshes.new("CAD_Boolean_Target")
+    cutter_mesh = bpy.data.meshes.new("CAD_Boolean_Cutter")
+    bm.to_mesh(mesh)
+    if isinstance(cutter, MeshSnapshot):
+        cutter.restore(cutter_mesh)
+    else:
+        cutter.to_mesh(cutter_mesh)
+    scene = bpy.data.scenes.new("CAD_Boolean_Scratch")
+    target = bpy.data.objects.new("CAD_Boolean_Target", mesh)
+    cutter_obj = bpy.data.objects.new("CAD_Boolean_Cutter", cutter_mesh)
+    try:
+        scene.collection.objects.link(target)
+        scene.collection.objects.link(cutter_obj)
+        mod = target.modifiers.new(name="CAD_Boolean", type='BOOLEAN')
+        mod.operation = 'DIFFERENCE'
+        mod.object = cutter_obj
+        mod.solver = solver
+        depsgraph = scene.view_layers[0].depsgraph
+        depsgraph.update()
+        bm.clear()
+        bm.from_object(target.evaluated_get(depsgraph), depsgraph)
+    finally:
+        bpy.data.objects.remove(target, do_unlink=True)
+        bpy.data.objects.remove(cutter_obj, do_unlink=True)
+        bpy.data.scenes.remove(scene)
+        bpy.data.meshes.remove(mesh)
+        bpy.data.meshes.remove(cutter_mesh)
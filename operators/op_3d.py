@@ -1,7 +1,10 @@
 # --- File: operators/op_3d.py ---
 import bpy
-import bmesh
 import math
+from mathutils import Vector
+from . import mesh_ops
+from .regeneration import record_base_mesh, tracking_suspended, new_feature
+from .. import profiling
 
 class MESH_OT_create_hole(bpy.types.Operator):
     """Creates a hole (simple, counterbore, or countersink) at the 3D cursor."""
@@ -34,55 +37,137 @@ class MESH_OT_create_hole(bpy.types.Operator):
             layout.separator()
             layout.prop(self, "cs_angle")
 
+    @profiling.profiled
     def execute(self, context):
-        target_obj = context.active_object
+        target_obj = feature_target(context, None)
+        if target_obj is None:
+            self.report({'WARNING'}, "No active mesh object selected.")
+            return {'CANCELLED'}
         cursor_loc = context.scene.cursor.location
-        bm = bmesh.new()
+        record_base_mesh(target_obj)
+
+        # Added to the feature tree and applied when the block ends. The
+        # difference is evaluated on the mesh data itself, the same way
+        # regeneration replays it: no cutter in the scene, no selection changes
+        # and no modifier_apply.
+        try:
+            with new_feature(target_obj, "Create Hole", 'CREATE_HOLE') as feature:
+                feature.hole_type = self.hole_type
+                feature.hole_diameter = self.diameter
+                feature.hole_depth = self.depth
+                feature.hole_cb_diameter = self.cb_diameter
+                feature.hole_cb_depth = self.cb_depth
+                feature.hole_cs_angle = self.cs_angle
+                feature.hole_location = target_obj.matrix_world.inverted_safe() @ cursor_loc
+                store_placement(feature, target_obj)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
-        # Main hole
-        cone_main = bmesh.ops.create_cone(bm, cap_ends=True, segments=64, radius1=self.diameter / 2, radius2=self.diameter / 2, depth=self.depth)
-        bmesh.ops.translate(bm, verts=cone_main['verts'], vec=(0, 0, -self.depth / 2))
+        return {'FINISHED'}
 
-        if self.hole_type == 'COUNTERBORE':
-            if self.cb_diameter <= self.diameter or self.cb_depth <= 0:
-                self.report({'ERROR'}, "Counterbore dimensions must be larger than hole.")
-                return {'CANCELLED'}
-            cone_cb = bmesh.ops.create_cone(bm, cap_ends=True, segments=64, radius1=self.cb_diameter / 2, radius2=self.cb_diameter / 2, depth=self.cb_depth)
-            bmesh.ops.translate(bm, verts=cone_cb['verts'], vec=(0, 0, self.cb_depth / 2))
 
+class MESH_OT_create_hole_pattern(bpy.types.Operator):
+    """Cuts a linear, rectangular, polar or point-based pattern of identical holes in one boolean."""
+    bl_idname = "mesh.create_hole_pattern"
+    bl_label = "Hole Pattern"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    hole_type: bpy.props.EnumProperty(name="Type", items=[('SIMPLE', "Simple", ""), ('COUNTERBORE', "Counterbore", ""), ('COUNTERSINK', "Countersink", "")], default='SIMPLE')
+    diameter: bpy.props.FloatProperty(name="Diameter", default=0.005, min=0.0001, subtype='DISTANCE')
+    depth: bpy.props.FloatProperty(name="Depth", default=0.01, min=0.0001, subtype='DISTANCE')
+    cb_diameter: bpy.props.FloatProperty(name="CB Diameter", default=0.01, min=0.0001, subtype='DISTANCE')
+    cb_depth: bpy.props.FloatProperty(name="CB Depth", default=0.002, min=0.0001, subtype='DISTANCE')
+    cs_angle: bpy.props.FloatProperty(name="CS Angle", default=90.0, min=1.0, max=179.0, subtype='ANGLE')
+
+    pattern_type: bpy.props.EnumProperty(
+        name="Pattern",
+        items=[
+            ('LINEAR', "Linear", "A row of holes along X, starting at the 3D cursor"),
+            ('RECTANGULAR', "Rectangular", "A grid of holes in the XY plane, starting at the 3D cursor"),
+            ('POLAR', "Polar", "Holes on a circle around the 3D cursor"),
+            ('POINTS', "Selected Vertices", "One hole at every selected vertex of the active object"),
+        ],
+        default='LINEAR'
+    )
+    count_x: bpy.props.IntProperty(name="Count", default=4, min=1)
+    count_y: bpy.props.IntProperty(name="Rows", default=2, min=1)
+    spacing_x: bpy.props.FloatProperty(name="Spacing X", default=0.02, subtype='DISTANCE')
+    spacing_y: bpy.props.FloatProperty(name="Spacing Y", default=0.02, subtype='DISTANCE')
+    radius: bpy.props.FloatProperty(name="Radius", default=0.03, min=0.0, subtype='DISTANCE')
+    start_angle: bpy.props.FloatProperty(name="Start Angle", default=0.0, subtype='ANGLE', unit='ROTATION')
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def draw(self, context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop(self, "hole_type")
+        layout.prop(self, "diameter")
+        layout.prop(self, "depth")
+        if self.hole_type == 'COUNTERBORE':
+            layout.prop(self, "cb_diameter")
+            layout.prop(self, "cb_depth")
         elif self.hole_type == 'COUNTERSINK':
-            cs_radius = self.diameter / 2
-            cs_depth = cs_radius / math.tan(math.radians(self.cs_angle / 2))
-            cone_cs = bmesh.ops.create_cone(bm, cap_ends=True, segments=64, radius1=cs_radius, radius2=0, depth=cs_depth)
-            bmesh.ops.translate(bm, verts=cone_cs['verts'], vec=(0, 0, cs_depth / 2))
-        
-        cutter_mesh = bpy.data.meshes.new("HoleCutter_Mesh")
-        bm.to_mesh(cutter_mesh)
-        bm.free()
-        cutter_obj = bpy.data.objects.new("HoleCutter", cutter_mesh)
-        cutter_obj.location = cursor_loc
-        context.collection.objects.link(cutter_obj)
-        mod = target_obj.modifiers.new(name="HoleBoolean", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = cutter_obj
-        mod.solver = 'FAST'
-        bpy.ops.object.select_all(action='DESELECT')
-        target_obj.select_set(True)
-        context.view_layer.objects.active = target_obj
-        bpy.ops.object.modifier_apply({"modifier": mod.name})
-        bpy.data.objects.remove(cutter_obj, do_unlink=True)
-        bpy.data.meshes.remove(cutter_mesh)
-
-        # Add to feature tree
-        feature = target_obj.object_cad_settings.feature_tree.add()
-        feature.name = "Create Hole"
-        feature.type = 'CREATE_HOLE'
-        feature.hole_type = self.hole_type
-        feature.hole_diameter = self.diameter
-        feature.hole_depth = self.depth
-        feature.hole_cb_diameter = self.cb_diameter
-        feature.hole_cb_depth = self.cb_depth
-        feature.hole_cs_angle = self.cs_angle
+            layout.prop(self, "cs_angle")
+        layout.separator()
+        layout.prop(self, "pattern_type")
+        if self.pattern_type in {'LINEAR', 'RECTANGULAR', 'POLAR'}:
+            layout.prop(self, "count_x")
+        if self.pattern_type == 'RECTANGULAR':
+            layout.prop(self, "count_y")
+        if self.pattern_type in {'LINEAR', 'RECTANGULAR'}:
+            layout.prop(self, "spacing_x")
+        if self.pattern_type == 'RECTANGULAR':
+            layout.prop(self, "spacing_y")
+        if self.pattern_type == 'POLAR':
+            layout.prop(self, "radius")
+            layout.prop(self, "start_angle")
+
+    @profiling.profiled
+    def execute(self, context):
+        # Leaves edit mode first, so the vertex selection read below is current
+        target_obj = feature_target(context, None)
+        if target_obj is None:
+            self.report({'WARNING'}, "No active mesh object selected.")
+            return {'CANCELLED'}
+        cursor_loc = context.scene.cursor.location
+
+        points = []
+        if self.pattern_type == 'POINTS':
+            mesh = target_obj.data
+            points = [v.co.copy() for v in mesh.vertices if v.select]
+            if not points:
+                self.report({'WARNING'}, "No vertices selected for the hole pattern.")
+                return {'CANCELLED'}
+        record_base_mesh(target_obj)
+
+        # The whole pattern is a single feature, so it regenerates as one unit.
+        # It is added to the feature tree and applied when the block ends.
+        try:
+            with new_feature(target_obj, "Hole Pattern", 'HOLE_PATTERN') as feature:
+                feature.hole_type = self.hole_type
+                feature.hole_diameter = self.diameter
+                feature.hole_depth = self.depth
+                feature.hole_cb_diameter = self.cb_diameter
+                feature.hole_cb_depth = self.cb_depth
+                feature.hole_cs_angle = self.cs_angle
+                feature.hole_location = target_obj.matrix_world.inverted_safe() @ cursor_loc
+                store_placement(feature, target_obj)
+                feature.pattern_type = self.pattern_type
+                feature.pattern_count_x = self.count_x
+                feature.pattern_count_y = self.count_y
+                feature.pattern_spacing_x = self.spacing_x
+                feature.pattern_spacing_y = self.spacing_y
+                feature.pattern_radius = self.radius
+                feature.pattern_start_angle = self.start_angle
+                for co in points:
+                    feature.pattern_points.add().co = co
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
         return {'FINISHED'}
 
@@ -96,104 +181,190 @@ class MESH_OT_create_gear(bpy.types.Operator):
     module: bpy.props.FloatProperty(name="Module", default=0.1, min=0.01)
     num_teeth: bpy.props.IntProperty(name="Number of Teeth", default=12, min=3)
     width: bpy.props.FloatProperty(name="Width", default=0.2, min=0.001, subtype='DISTANCE')
+    flank_samples: bpy.props.IntProperty(name="Flank Samples", description="Points sampled along each involute flank", default=8, min=2, max=256)
 
+    @profiling.profiled
     def execute(self, context):
-        pressure_angle = math.radians(20)
-        pitch_diameter = self.module * self.num_teeth
-        pitch_radius = pitch_diameter / 2
-        base_radius = pitch_radius * math.cos(pressure_angle)
-        addendum = self.module
-        dedendum = 1.25 * self.module
-        outer_radius = pitch_radius + addendum
-        root_radius = pitch_radius - dedendum
-        if base_radius > root_radius:
-            root_radius = base_radius
-        bm = bmesh.new()
-        verts = []
-        tooth_angle = 2 * math.pi / self.num_teeth
-        for i in range(self.num_teeth * 4):
-            tooth_i = i // 4
-            part_i = i % 4
-            radius = root_radius if part_i == 0 or part_i == 3 else outer_radius
-            angle_rad = (tooth_i / self.num_teeth) * 2 * math.pi
-            angle_rad += ((part_i - 1.5) / 2) * (tooth_angle * 0.5)
-            x = radius * math.cos(angle_rad)
-            y = radius * math.sin(angle_rad)
-            verts.append(bm.verts.new((x, y, 0)))
-        bm.faces.new(verts)
-        geom = bmesh.ops.extrude_face_region(bm, geom=bm.faces)
-        bmesh.ops.translate(bm, verts=[v for v in geom['geom'] if isinstance(v, bmesh.types.BMVert)], vec=(0, 0, self.width))
-        gear_mesh = bpy.data.meshes.new("SpurGear_Mesh")
-        bm.to_mesh(gear_mesh)
-        bm.free()
-        gear_obj = bpy.data.objects.new("SpurGear", gear_mesh)
+        gear_obj = new_gear_object(self.module, self.num_teeth, self.width, self.flank_samples)
         context.collection.objects.link(gear_obj)
         context.view_layer.objects.active = gear_obj
         gear_obj.select_set(True)
+        return {'FINISHED'}
+
 
-        # Add to feature tree
+def new_gear_object(module, num_teeth, width, flank_samples):
+    """Returns a new, unlinked gear object with its Create Gear feature."""
+    # Gears with the same parameters are linked duplicates of one library mesh
+    gear_mesh = mesh_ops.gear_library.get(module, num_teeth, width, flank_samples)
+    gear_obj = bpy.data.objects.new("SpurGear", gear_mesh)
+    # The gear is generated entirely by its feature, so it regenerates from nothing
+    record_base_mesh(gear_obj, bpy.data.meshes.new("SpurGear_Base"))
+
+    # Add to feature tree
+    with tracking_suspended(), profiling.phase("feature_tree"):
         feature = gear_obj.object_cad_settings.feature_tree.add()
         feature.name = "Create Gear"
         feature.type = 'CREATE_GEAR'
-        feature.gear_module = self.module
-        feature.gear_num_teeth = self.num_teeth
-        feature.gear_width = self.width
+        feature.gear_module = module
+        feature.gear_num_teeth = num_teeth
+        feature.gear_width = width
+        feature.gear_flank_samples = flank_samples
+    return gear_obj
+
+
+def gear_train_layout(tooth_counts, module, angle):
+    """Returns (offset, rotation) per gear of a straight train of meshing gears.
+
+    Gears are placed along the direction angle at centre distance
+    m * (z1 + z2) / 2, and each one is rotated so a tooth space faces the
+    tooth of the previous gear that lies on the line of centres.
+    """
+    direction = Vector((math.cos(angle), math.sin(angle), 0))
+    layout = [(Vector(), 0.0)]
+    for prev_teeth, teeth in zip(tooth_counts, tooth_counts[1:]):
+        prev_offset, prev_rotation = layout[-1]
+        offset = prev_offset + direction * (module * (prev_teeth + teeth) / 2)
+        # Fraction of a pitch the previous gear's nearest tooth sits behind the line of centres
+        s = ((angle - prev_rotation) * prev_teeth / (2 * math.pi)) % 1.0
+        rotation = angle + math.pi - (0.5 - s) * 2 * math.pi / teeth
+        layout.append((offset, rotation))
+    return layout
+
+
+class MESH_OT_create_gear_train(bpy.types.Operator):
+    """Creates a train of meshing spur gears from a list of tooth counts."""
+    bl_idname = "mesh.create_gear_train"
+    bl_label = "Create Gear Train"
+    bl_options = {'REGISTER', 'UNDO'}
 
+    tooth_counts: bpy.props.StringProperty(name="Teeth", description="Comma separated tooth count of every gear in the train", default="12, 24, 18")
+    module: bpy.props.FloatProperty(name="Module", default=0.1, min=0.01)
+    width: bpy.props.FloatProperty(name="Width", default=0.2, min=0.001, subtype='DISTANCE')
+    flank_samples: bpy.props.IntProperty(name="Flank Samples", description="Points sampled along each involute flank", default=8, min=2, max=256)
+    angle: bpy.props.FloatProperty(name="Direction", description="Direction of the train in the XY plane", default=0.0, subtype='ANGLE', unit='ROTATION')
+
+    @profiling.profiled
+    def execute(self, context):
+        try:
+            counts = [int(part) for part in self.tooth_counts.replace(";", ",").split(",") if part.strip()]
+        except ValueError:
+            self.report({'ERROR'}, "Tooth counts must be whole numbers separated by commas.")
+            return {'CANCELLED'}
+        if not counts or min(counts) < 3:
+            self.report({'ERROR'}, "Every gear needs at least 3 teeth.")
+            return {'CANCELLED'}
+
+        cursor_loc = context.scene.cursor.location
+        collection = bpy.data.collections.new("GearTrain")
+        gears = []
+        for teeth, (offset, rotation) in zip(counts, gear_train_layout(counts, self.module, self.angle)):
+            gear_obj = new_gear_object(self.module, teeth, self.width, self.flank_samples)
+            gear_obj.location = cursor_loc + offset
+            gear_obj.rotation_euler.z = rotation
+            collection.objects.link(gear_obj)
+            gears.append(gear_obj)
+
+        # The whole train enters the scene at once
+        context.collection.children.link(collection)
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for gear_obj in gears:
+            gear_obj.select_set(True)
+        context.view_layer.objects.active = gears[0]
         return {'FINISHED'}
 
 
+def feature_target(context, object_name):
+    """Returns the mesh object a feature operator works on, or None.
+
+    That is the object called object_name if one is given, so scripts can
+    run features on objects that are neither active nor selected, and the
+    active object otherwise. An object in edit mode is switched to object
+    mode first so its mesh data is current.
+    """
+    obj = bpy.data.objects.get(object_name) if object_name else context.active_object
+    if obj is None or obj.type != 'MESH':
+        return None
+    if obj.mode == 'EDIT':
+        with profiling.phase("mode_switch"):
+            bpy.ops.object.mode_set(mode='OBJECT')
+    return obj
+
+
+def store_selection(feature, elements):
+    """Limits feature to the selected elements, or to the whole mesh if none are selected."""
+    indices = mesh_ops.selected_indices(elements)
+    if indices:
+        feature.selection_mode = 'SELECTED'
+        feature.selection_indices = mesh_ops.encode_index_ranges(indices)
+    else:
+        feature.selection_mode = 'ALL'
+
+
+def store_placement(feature, obj):
+    """Stores the current world axes of obj on feature, so it keeps its direction when obj is moved later."""
+    feature.placement = obj.matrix_world.to_3x3().inverted_safe()
+
+
 class MESH_OT_simple_extrude(bpy.types.Operator):
-    """Extrudes the selected faces of the active object."""
+    """Extrudes the selected faces of the active object, or the whole mesh if no face is selected."""
     bl_idname = "mesh.simple_extrude"
     bl_label = "Extrude"
     bl_options = {'REGISTER', 'UNDO'}
 
     extrude_depth: bpy.props.FloatProperty(name="Depth", default=1.0, subtype='DISTANCE')
+    object_name: bpy.props.StringProperty(name="Object", description="Object to extrude instead of the active object", options={'SKIP_SAVE'})
 
+    @profiling.profiled
     def execute(self, context):
-        if context.active_object and context.active_object.type == 'MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-            bpy.ops.mesh.extrude_region_move(TRANSFORM_OT_translate={"value": (0, 0, self.extrude_depth)})
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-            # Add to feature tree
-            feature = context.active_object.object_cad_settings.feature_tree.add()
-            feature.name = "Extrude"
-            feature.type = 'EXTRUDE'
-            feature.extrude_depth = self.extrude_depth
-        else:
+        target_obj = feature_target(context, self.object_name)
+        if target_obj is None:
             self.report({'WARNING'}, "No active mesh object selected.")
             return {'CANCELLED'}
+        record_base_mesh(target_obj)
+
+        # Added to the feature tree and applied when the block ends, in one
+        # bmesh round trip in object mode shared with regeneration
+        try:
+            with new_feature(target_obj, "Extrude", 'EXTRUDE') as feature:
+                feature.extrude_depth = self.extrude_depth
+                store_placement(feature, target_obj)
+                store_selection(feature, target_obj.data.polygons)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
         return {'FINISHED'}
 
 
 
 class MESH_OT_bevel_edges(bpy.types.Operator):
-    """Bevels the selected edges of the active object."""
+    """Bevels the selected edges of the active object, or every edge if none is selected."""
     bl_idname = "mesh.bevel_edges"
     bl_label = "Bevel Edges"
     bl_options = {'REGISTER', 'UNDO'}
 
     bevel_amount: bpy.props.FloatProperty(name="Amount", default=0.2, subtype='DISTANCE')
     bevel_segments: bpy.props.IntProperty(name="Segments", default=4, min=1)
+    object_name: bpy.props.StringProperty(name="Object", description="Object to bevel instead of the active object", options={'SKIP_SAVE'})
 
+    @profiling.profiled
     def execute(self, context):
-        if context.active_object and context.active_object.type == 'MESH':
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='SELECT')
-            bpy.ops.mesh.bevel(offset=self.bevel_amount, segments=self.bevel_segments)
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-            # Add to feature tree
-            feature = context.active_object.object_cad_settings.feature_tree.add()
-            feature.name = "Bevel"
-            feature.type = 'BEVEL'
-            feature.bevel_amount = self.bevel_amount
-            feature.bevel_segments = self.bevel_segments
-        else:
+        target_obj = feature_target(context, self.object_name)
+        if target_obj is None:
             self.report({'WARNING'}, "No active mesh object selected.")
             return {'CANCELLED'}
+        record_base_mesh(target_obj)
+
+        # Added to the feature tree and applied when the block ends, in one
+        # bmesh round trip in object mode shared with regeneration
+        try:
+            with new_feature(target_obj, "Bevel", 'BEVEL') as feature:
+                feature.bevel_amount = self.bevel_amount
+                feature.bevel_segments = self.bevel_segments
+                store_selection(feature, target_obj.data.edges)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
         return {'FINISHED'}
 
 class MESH_OT_inner_radius(bpy.types.Operator):
@@ -259,74 +430,38 @@ class MESH_OT_inner_radius(bpy.types.Operator):
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
+    @profiling.profiled
     def execute(self, context):
-        target_obj = context.active_object
-        
-        # Apply scale of target object to avoid issues with dimensions
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-
-        # Duplicate the object to create the cutter
-        bpy.ops.object.duplicate()
-        cutter_obj = context.active_object
-
-        # Move the cutter
-        cutter_obj.location.x += self.offset_x
-        cutter_obj.location.y += self.offset_y
-        cutter_obj.location.z += self.offset_z
-
-        # Rotate the cutter
-        cutter_obj.rotation_euler.z += self.rotation
-
-        # Calculate scale factors from wall thickness
-        dims = target_obj.dimensions
-        
-        if dims.x == 0 or dims.y == 0 or dims.z == 0:
-            self.report({'ERROR'}, "Object has zero dimension on one or more axes.")
-            bpy.data.objects.remove(cutter_obj, do_unlink=True)
+        target_obj = feature_target(context, None)
+        if target_obj is None:
+            self.report({'WARNING'}, "No active mesh object selected.")
             return {'CANCELLED'}
-            
-        scale_x = (dims.x - 2 * self.width) / dims.x if dims.x != 0 else 1
-        scale_y = (dims.y - 2 * self.length) / dims.y if dims.y != 0 else 1
-        scale_z = (dims.z - 2 * self.height) / dims.z if dims.z != 0 else 1
-        
-        if scale_x <= 0 or scale_y <= 0 or scale_z <= 0:
-            self.report({'ERROR'}, "Wall thickness is too large for the object dimensions.")
-            bpy.data.objects.remove(cutter_obj, do_unlink=True)
+        record_base_mesh(target_obj)
+
+        # Added to the feature tree and applied when the block ends. The
+        # cutter is a scaled copy of the mesh arrays subtracted in one boolean,
+        # so the object's transform and the selection stay as they are.
+        try:
+            with new_feature(target_obj, "Inner Radius", 'INNER_RADIUS') as feature:
+                feature.inner_radius_width = self.width
+                feature.inner_radius_length = self.length
+                feature.inner_radius_height = self.height
+                feature.inner_radius_offset_x = self.offset_x
+                feature.inner_radius_offset_y = self.offset_y
+                feature.inner_radius_offset_z = self.offset_z
+                feature.inner_radius_rotation = self.rotation
+                store_placement(feature, target_obj)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
             return {'CANCELLED'}
 
-        # Scale the cutter
-        bpy.ops.transform.resize(value=(scale_x, scale_y, scale_z))
-
-        # Add boolean modifier to the original object
-        bpy.context.view_layer.objects.active = target_obj
-        mod = target_obj.modifiers.new(name="InnerRadiusBoolean", type='BOOLEAN')
-        mod.operation = 'DIFFERENCE'
-        mod.object = cutter_obj
-        mod.solver = 'FAST'
-
-        # Apply the modifier
-        bpy.ops.object.modifier_apply(modifier=mod.name)
-
-        # Clean up the cutter object
-        bpy.data.objects.remove(cutter_obj, do_unlink=True)
-
-        # Add to feature tree
-        feature = target_obj.object_cad_settings.feature_tree.add()
-        feature.name = "Inner Radius"
-        feature.type = 'INNER_RADIUS'
-        feature.inner_radius_width = self.width
-        feature.inner_radius_length = self.length
-        feature.inner_radius_height = self.height
-        feature.inner_radius_offset_x = self.offset_x
-        feature.inner_radius_offset_y = self.offset_y
-        feature.inner_radius_offset_z = self.offset_z
-        feature.inner_radius_rotation = self.rotation
-
         return {'FINISHED'}
 
 classes = (
     MESH_OT_create_hole,
+    MESH_OT_create_hole_pattern,
     MESH_OT_create_gear,
+    MESH_OT_create_gear_train,
     MESH_OT_simple_extrude,
     MESH_OT_bevel_edges,
     MESH_OT_inner_radius,
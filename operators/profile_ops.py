@@ -0,0 +1,54 @@
+# --- File: operators/profile_ops.py ---
+import bpy
+import json
+from bpy_extras.io_utils import ExportHelper
+from .. import profiling
+
+class WM_OT_cad_export_profile(bpy.types.Operator, ExportHelper):
+    """Export the recorded CAD Tools timings and their p50/p95 summary as JSON"""
+    bl_idname = "wm.cad_export_profile"
+    bl_label = "Export Profile"
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default='*.json', options={'HIDDEN'})
+
+    def execute(self, context):
+        report = {
+            "summary": profiling.summary(),
+            "records": [
+                {"label": label, "seconds": seconds, "blocks": blocks}
+                for label, seconds, blocks in profiling.records
+            ],
+        }
+        try:
+            with open(self.filepath, "w") as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported {len(report['records'])} timings.")
+        return {'FINISHED'}
+
+
+class WM_OT_cad_clear_profile(bpy.types.Operator):
+    """Discard the recorded CAD Tools timings"""
+    bl_idname = "wm.cad_clear_profile"
+    bl_label = "Clear Profile"
+
+    def execute(self, context):
+        profiling.clear()
+        return {'FINISHED'}
+
+
+classes = (
+    WM_OT_cad_export_profile,
+    WM_OT_cad_clear_profile,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -2,6 +2,7 @@
 import bpy
 import math
 from bpy_extras.io_utils import ImportHelper
+from .. import profiling
 
 class IMAGE_OT_load_reference(bpy.types.Operator, ImportHelper):
     """Load a reference image for a specific view"""
@@ -12,6 +13,7 @@ class IMAGE_OT_load_reference(bpy.types.Operator, ImportHelper):
     filter_glob: bpy.props.StringProperty(default='*.png;*.jpg;*.jpeg;*.bmp;*.tif', options={'HIDDEN'})
     view_type: bpy.props.StringProperty()
 
+    @profiling.profiled
     def execute(self, context):
         settings = context.scene.scene_cad_settings
         image_settings_key = f"{self.view_type.lower()}_image"
@@ -64,6 +66,7 @@ class IMAGE_OT_clear_reference(bpy.types.Operator):
 
     view_type: bpy.props.StringProperty()
 
+    @profiling.profiled
     def execute(self, context):
         settings = context.scene.scene_cad_settings
         image_settings_key = f"{self.view_type.lower()}_image"
@@ -0,0 +1,393 @@
+# --- File: operators/regeneration.py ---
+import bpy
+import bmesh
+import time
+import numpy as np
+from contextlib import contextmanager
+from bpy.app.handlers import persistent
+from mathutils import Vector
+from . import mesh_ops
+from .checkpoints import CheckpointStore
+from .. import profiling
+
+# Mesh state after each feature, shared by every object and sized from
+# SceneCADSettings.checkpoint_memory_mb.
+checkpoint_store = CheckpointStore()
+
+# Seconds a feature parameter has to stay unchanged before the object is rebuilt,
+# so dragging a slider does not regenerate on every intermediate value.
+REGENERATE_DELAY = 0.3
+
+# Object name -> lowest dirty feature index waiting for the debounce timer.
+_pending = {}
+_pending_deadline = 0.0
+_tracking_suspended = 0
+
+
+def record_base_mesh(obj, mesh=None):
+    """Stores the geometry the feature tree of obj is replayed onto.
+
+    Called by the feature operators before they change obj for the first
+    time. Uses a copy of obj.data unless an explicit base mesh is given.
+    Objects whose tree was started without a base mesh are left alone, since
+    their current geometry already contains those features.
+    """
+    settings = obj.object_cad_settings
+    if settings.base_mesh is not None or len(settings.feature_tree):
+        return
+    if mesh is None:
+        mesh = obj.data.copy()
+    mesh.name = f"{obj.name}_CAD_Base"
+    settings.base_mesh = mesh
+
+
+def _chord_tolerance():
+    """The scene's hole chord tolerance, or None to fall back to a fixed segment count."""
+    scene = bpy.context.scene
+    return scene.scene_cad_settings.hole_chord_tolerance if scene else None
+
+
+# --- Feature builders: each applies one CADFeature to bm in obj's local space ---
+# Directions and positions come from the feature itself (see CADFeature.placement),
+# never from obj's current transform, so moving a part does not change its features.
+
+def _feature_elements(feature, seq):
+    """The indices into seq (bm.faces or bm.edges) a feature is limited to, or None for the whole mesh.
+
+    The element count of the feature's input is stored with the feature the
+    first time it is applied. Upstream features can renumber the elements,
+    e.g. a hole that gets a new segment count, so later replays raise
+    ValueError when the count no longer matches. Edits that only move the
+    elements, such as a new extrude depth, keep the count and replay as
+    usual.
+    """
+    if feature.selection_mode != 'SELECTED':
+        return None
+    indices = mesh_ops.decode_index_ranges(feature.selection_indices)
+    count = mesh_ops.selection_element_count(seq, indices)
+    if not feature.selection_count:
+        feature.selection_count = count
+    elif count != feature.selection_count:
+        raise ValueError("The stored selection no longer matches the mesh topology.")
+    return indices
+
+def _apply_extrude(obj, bm, feature):
+    # Extrudes along global Z as it was when the feature was added
+    offset = feature.placement @ Vector((0, 0, feature.extrude_depth))
+    mesh_ops.extrude_region(bm, offset, _feature_elements(feature, bm.faces))
+
+def _apply_bevel(obj, bm, feature):
+    mesh_ops.bevel_edges(bm, feature.bevel_amount, feature.bevel_segments, _feature_elements(feature, bm.edges))
+
+def _apply_hole(obj, bm, feature):
+    cutter = mesh_ops.build_hole_pattern_cutter(
+        feature.placement, [feature.hole_location],
+        feature.hole_type, feature.hole_diameter, feature.hole_depth,
+        feature.hole_cb_diameter, feature.hole_cb_depth, feature.hole_cs_angle,
+        chord_tolerance=_chord_tolerance(),
+    )
+    mesh_ops.boolean_difference(bm, cutter)
+
+def _apply_hole_pattern(obj, bm, feature):
+    positions = mesh_ops.hole_pattern_positions(
+        feature.pattern_type, feature.hole_location,
+        feature.pattern_count_x, feature.pattern_count_y,
+        feature.pattern_spacing_x, feature.pattern_spacing_y,
+        feature.pattern_radius, feature.pattern_start_angle,
+        [p.co for p in feature.pattern_points], feature.placement,
+    )
+    if not positions:
+        raise ValueError("The hole pattern has no positions.")
+    # All cutters are merged into one mesh and subtracted in a single boolean
+    cutter = mesh_ops.build_hole_pattern_cutter(
+        feature.placement, positions,
+        feature.hole_type, feature.hole_diameter, feature.hole_depth,
+        feature.hole_cb_diameter, feature.hole_cb_depth, feature.hole_cs_angle,
+        chord_tolerance=_chord_tolerance(),
+    )
+    mesh_ops.boolean_difference(bm, cutter)
+
+def _apply_inner_radius(obj, bm, feature):
+    # The cutter is a scaled copy of the part's own vertex arrays
+    snapshot = mesh_ops.bmesh_snapshot(bm)
+    co = snapshot.co.reshape(-1, 3)
+    if not len(co):
+        raise ValueError("Object has zero dimension on one or more axes.")
+    # Row i of the placement has length 1 / (world scale of local axis i)
+    placement = feature.placement
+    axis_scale = np.array([1 / row.length if row.length else 0.0 for row in placement.row])
+    extent = (co.max(axis=0) - co.min(axis=0)) * axis_scale
+    wall = (feature.inner_radius_width, feature.inner_radius_length, feature.inner_radius_height)
+    offset = placement @ Vector((
+        feature.inner_radius_offset_x, feature.inner_radius_offset_y, feature.inner_radius_offset_z,
+    ))
+    cutter = mesh_ops.build_inner_radius_cutter(snapshot, extent.tolist(), wall, offset, feature.inner_radius_rotation)
+    mesh_ops.boolean_difference(bm, cutter)
+
+def _apply_gear(obj, bm, feature):
+    mesh_ops.build_spur_gear(bm, feature.gear_module, feature.gear_num_teeth, feature.gear_width, feature.gear_flank_samples)
+
+
+FEATURE_BUILDERS = {
+    'EXTRUDE': _apply_extrude,
+    'BEVEL': _apply_bevel,
+    'CREATE_HOLE': _apply_hole,
+    'HOLE_PATTERN': _apply_hole_pattern,
+    'INNER_RADIUS': _apply_inner_radius,
+    'CREATE_GEAR': _apply_gear,
+}
+
+
+def feature_dependencies(features):
+    """Returns, for each feature, the set of feature indices whose output it consumes.
+
+    Every feature is applied to the geometry left by the one before it, so
+    the graph is currently a chain; downstream_features() only relies on
+    dependencies pointing to earlier features.
+    """
+    return [set() if index == 0 else {index - 1} for index in range(len(features))]
+
+def downstream_features(features, index):
+    """Returns the indices of feature index and every feature that depends on it."""
+    dependencies = feature_dependencies(features)
+    stale = {index}
+    for i in range(index + 1, len(features)):
+        if dependencies[i] & stale:
+            stale.add(i)
+    return stale
+
+@contextmanager
+def tracking_suspended():
+    """Lets operators fill in a new feature without scheduling a rebuild."""
+    global _tracking_suspended
+    _tracking_suspended += 1
+    try:
+        yield
+    finally:
+        _tracking_suspended -= 1
+
+def mark_feature_dirty(feature):
+    """Flags feature and its downstream features stale and schedules a debounced rebuild."""
+    if _tracking_suspended:
+        return
+    obj = feature.id_data
+    if not isinstance(obj, bpy.types.Object) or obj.object_cad_settings.base_mesh is None:
+        return
+    path = feature.path_from_id() # e.g. 'object_cad_settings.feature_tree[3]'
+    index = int(path[path.rindex('[') + 1:-1])
+
+    features = obj.object_cad_settings.feature_tree
+    for i in downstream_features(features, index):
+        features[i].is_dirty = True
+    _pending[obj.name] = min(_pending.get(obj.name, index), index)
+
+    global _pending_deadline
+    _pending_deadline = time.monotonic() + REGENERATE_DELAY
+    if not bpy.app.timers.is_registered(_regenerate_pending):
+        bpy.app.timers.register(_regenerate_pending, first_interval=REGENERATE_DELAY)
+
+def _regenerate_pending():
+    """Timer callback: rebuilds every object with dirty features once edits have settled."""
+    remaining = _pending_deadline - time.monotonic()
+    if remaining > 0:
+        return remaining
+    pending = dict(_pending)
+    _pending.clear()
+    for name, index in pending.items():
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.object_cad_settings.base_mesh is None:
+            continue
+        if obj.mode == 'EDIT':
+            # Leaving edit mode would overwrite the rebuilt mesh; try again later
+            _pending[name] = min(_pending.get(name, index), index)
+            continue
+        try:
+            regenerate(obj, from_index=index)
+        except ValueError as e:
+            # Shown in the feature tree panel until a rebuild succeeds
+            obj.object_cad_settings.regenerate_error = str(e)
+            print(f"Warning: Could not regenerate '{name}': {e}")
+        _tag_redraw()
+    return REGENERATE_DELAY if _pending else None
+
+def _tag_redraw():
+    """Redraws the 3D views so the panel shows the new geometry and any rebuild error."""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def _make_single_user(obj):
+    """Gives obj its own copy of its mesh before it is rewritten.
+
+    A copy is made when the mesh is shared with linked duplicates or comes
+    from the gear library, whose entries are handed to new gears by key and
+    must never be edited in place even while only one object uses them. The
+    copy drops the library key.
+    """
+    if obj.data.users > 1 or mesh_ops.GearMeshLibrary.KEY_PROP in obj.data:
+        mesh = obj.data.copy()
+        if mesh_ops.GearMeshLibrary.KEY_PROP in mesh:
+            del mesh[mesh_ops.GearMeshLibrary.KEY_PROP]
+        obj.data = mesh
+
+def _is_library_gear(settings, features):
+    """True for objects made by the gear operator and not modified since."""
+    return len(features) == 1 and features[0].type == 'CREATE_GEAR' and not len(settings.base_mesh.vertices)
+
+@profiling.profiled
+def apply_feature(obj, feature):
+    """Applies a single feature to obj.data with the same builder regeneration uses.
+
+    Works on the mesh data only, so obj does not have to be active or
+    selected. Raises ValueError if the feature cannot be applied.
+    """
+    builder = FEATURE_BUILDERS.get(feature.type)
+    if builder is None:
+        raise ValueError(f"Feature '{feature.name}' of type {feature.type} cannot be applied.")
+    _make_single_user(obj)
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(obj.data)
+        with profiling.phase(feature.type):
+            builder(obj, bm, feature)
+        bm.to_mesh(obj.data)
+    finally:
+        bm.free()
+    obj.data.update()
+
+@contextmanager
+def new_feature(obj, name, feature_type):
+    """Adds a feature to obj's tree, yields it to be filled in and applies it when the block ends.
+
+    Filling in the feature does not schedule a rebuild. If the block or
+    apply_feature raises, the feature is removed again and the exception
+    propagates, so a failed operator never leaves a feature behind.
+    """
+    features = obj.object_cad_settings.feature_tree
+    with tracking_suspended(), profiling.phase("feature_tree"):
+        feature = features.add()
+    try:
+        with tracking_suspended(), profiling.phase("feature_tree"):
+            feature.name = name
+            feature.type = feature_type
+            yield feature
+        apply_feature(obj, feature)
+    except BaseException:
+        features.remove(len(features) - 1)
+        raise
+
+def invalidate(obj, from_index=0):
+    """Drops the checkpoints of obj from feature from_index onwards."""
+    checkpoint_store.invalidate(obj.session_uid, from_index)
+
+def _inputs_key(obj):
+    """Everything outside obj's feature tree that its rebuilt geometry depends on.
+
+    That is the base mesh and the scene's hole chord tolerance. The builders
+    take positions and directions from the features, not from matrix_world,
+    so moving obj keeps its checkpoints.
+    """
+    base = obj.object_cad_settings.base_mesh
+    return (base.session_uid, len(base.vertices), len(base.polygons), _chord_tolerance())
+
+@profiling.profiled
+def regenerate(obj, from_index=0, features=None):
+    """Rebuilds obj.data from its base mesh and feature tree.
+
+    Replay starts from the closest resident checkpoint before from_index (or
+    before the first dirty feature, if that comes earlier), so editing
+    feature k only recomputes features k..n while its checkpoint survives in
+    the store. Returns the number of features replayed. Raises
+    ValueError if obj has no base mesh or a feature cannot be applied.
+
+    features replaces the tree with another sequence of its features, such
+    as the tree with one feature removed or two swapped. Callers change the
+    tree itself only once the rebuild has succeeded, so a failure leaves
+    both the tree and the geometry as they were.
+    """
+    settings = obj.object_cad_settings
+    if settings.base_mesh is None:
+        raise ValueError(f"'{obj.name}' has no recorded base mesh to regenerate from.")
+
+    if features is None:
+        features = settings.feature_tree
+    if _is_library_gear(settings, features):
+        # A plain gear just links the library mesh for its new parameters
+        feature = features[0]
+        obj.data = mesh_ops.gear_library.get(feature.gear_module, feature.gear_num_teeth, feature.gear_width, feature.gear_flank_samples)
+        feature.is_dirty = False
+        settings.regenerate_error = ""
+        return 1
+
+    uid = obj.session_uid
+    checkpoint_store.check_inputs(uid, _inputs_key(obj))
+    first_dirty = next((i for i, feature in enumerate(features) if feature.is_dirty), len(features))
+    from_index = min(max(from_index, 0), first_dirty)
+    checkpoint_store.invalidate(uid, from_index)
+    last, snapshot = checkpoint_store.latest_before(uid, from_index)
+    start = last + 1
+
+    # Checkpoints are taken from and restored through a scratch mesh
+    scratch = bpy.data.meshes.new("CAD_Regen_Scratch")
+    bm = bmesh.new()
+    try:
+        if snapshot is not None:
+            snapshot.restore(scratch)
+            bm.from_mesh(scratch)
+        else:
+            bm.from_mesh(settings.base_mesh)
+
+        for index in range(start, len(features)):
+            feature = features[index]
+            builder = FEATURE_BUILDERS.get(feature.type)
+            if builder is None:
+                raise ValueError(f"Feature '{feature.name}' of type {feature.type} cannot be replayed.")
+            try:
+                with profiling.phase(feature.type):
+                    builder(obj, bm, feature)
+            except ValueError as e:
+                raise ValueError(f"Feature '{feature.name}' failed: {e}") from e
+            bm.to_mesh(scratch)
+            checkpoint_store.put(uid, index, scratch)
+
+        # Only this object's mesh is rebuilt; linked duplicates keep theirs
+        _make_single_user(obj)
+        bm.to_mesh(obj.data)
+        obj.data.update()
+        for feature in features[start:]:
+            feature.is_dirty = False
+        if settings.regenerate_error:
+            settings.regenerate_error = ""
+    except Exception:
+        checkpoint_store.invalidate(uid, start)
+        raise
+    finally:
+        bm.free()
+        bpy.data.meshes.remove(scratch)
+    return len(features) - start
+
+
+@persistent
+def _on_load_post(*args):
+    """Checkpoints and pending rebuilds belong to the previous file's objects."""
+    _pending.clear()
+    checkpoint_store.clear()
+    mesh_ops.gear_library.clear()
+    scene = bpy.context.scene
+    if scene:
+        checkpoint_store.set_budget(scene.scene_cad_settings.checkpoint_memory_mb * 1024 * 1024)
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if bpy.app.timers.is_registered(_regenerate_pending):
+        bpy.app.timers.unregister(_regenerate_pending)
+    _pending.clear()
+    checkpoint_store.clear()
+    mesh_ops.cutter_templates.clear()
+    mesh_ops.gear_library.clear()
@@ -0,0 +1,143 @@
+# --- File: operators/sketch_buffer.py ---
+import math
+import numpy as np
+
+# Points closer than this are welded into a single vertex by every sketch writer.
+MERGE_DISTANCE = 0.0001
+
+
+class VertexHash:
+    """Tolerance-aware spatial hash for welding coincident points.
+
+    Points are bucketed into cubic cells the size of the tolerance. A lookup
+    checks the query's cell and its 26 neighbours, so a stored point within
+    the tolerance is found even when the two land on opposite sides of a cell
+    boundary.
+    """
+
+    def __init__(self, tolerance=MERGE_DISTANCE):
+        self.tolerance = tolerance
+        self.cells = {} # (cx, cy, cz) -> list of (vertex index, co)
+
+    def _cell(self, co):
+        t = self.tolerance
+        return (math.floor(co[0] / t), math.floor(co[1] / t), math.floor(co[2] / t))
+
+    def insert(self, co, index):
+        self.cells.setdefault(self._cell(co), []).append((index, (co[0], co[1], co[2])))
+
+    def find(self, co):
+        """Returns the index of the closest stored point within the tolerance, or None."""
+        cx, cy, cz = self._cell(co)
+        best = None
+        best_dist_sq = self.tolerance**2
+        for ix in (cx - 1, cx, cx + 1):
+            for iy in (cy - 1, cy, cy + 1):
+                for iz in (cz - 1, cz, cz + 1):
+                    for index, other in self.cells.get((ix, iy, iz), ()):
+                        dist_sq = (other[0] - co[0])**2 + (other[1] - co[1])**2 + (other[2] - co[2])**2
+                        if dist_sq < best_dist_sq:
+                            best_dist_sq = dist_sq
+                            best = index
+        return best
+
+
+class SketchBuffer:
+    """In-session geometry of the sketch object being drawn.
+
+    Vertices are welded through a VertexHash, and edges and faces are kept in
+    sets keyed on vertex indices, so adding a segment or face costs the same
+    no matter how large the sketch already is. The mesh datablock is only
+    rewritten by flush(), which the operator calls once per commit (or every
+    few hundred edges).
+    """
+
+    def __init__(self, obj, merge_distance=MERGE_DISTANCE):
+        self.obj = obj
+        self.coords = []
+        self.vertex_hash = VertexHash(merge_distance)
+        self.edges = []
+        self.edge_set = set() # (low index, high index)
+        self.faces = []
+        self.face_set = set() # frozenset of vertex indices
+        self.pending_edges = 0
+        self._load(obj.data)
+        self.flushed_vertices = len(self.coords) # vertices already in the mesh
+
+    def _load(self, mesh):
+        """Seeds the buffer with whatever geometry the mesh already has."""
+        if not len(mesh.vertices):
+            return
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+        mesh.vertices.foreach_get("co", coords)
+        for index, co in enumerate(coords.reshape(-1, 3).tolist()):
+            self.vertex_hash.insert(co, index)
+            self.coords.append(tuple(co))
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        for i, j in edges.reshape(-1, 2).tolist():
+            self.edge_set.add((min(i, j), max(i, j)))
+            self.edges.append((i, j))
+        for poly in mesh.polygons:
+            self.faces.append(tuple(poly.vertices))
+            self.face_set.add(frozenset(poly.vertices))
+
+    def vertex(self, co):
+        """Returns the index of the vertex at co, creating it if needed."""
+        index = self.vertex_hash.find(co)
+        if index is None:
+            index = len(self.coords)
+            self.vertex_hash.insert(co, index)
+            self.coords.append((co[0], co[1], co[2]))
+        return index
+
+    def add_edge(self, p1, p2):
+        """Adds an edge between two points unless it already exists. Returns True if added."""
+        v1 = self.vertex(p1)
+        v2 = self.vertex(p2)
+        if v1 == v2:
+            return False
+        key = (min(v1, v2), max(v1, v2))
+        if key in self.edge_set:
+            return False
+        self.edge_set.add(key)
+        self.edges.append((v1, v2))
+        self.pending_edges += 1
+        return True
+
+    def add_face(self, points):
+        """Adds a face through the given ordered points unless one with the same vertices exists.
+
+        Returns True if a face was added.
+        """
+        indices = []
+        for p in points:
+            index = self.vertex(p)
+            if not indices or indices[-1] != index:
+                indices.append(index)
+        if len(indices) > 1 and indices[0] == indices[-1]:
+            indices.pop()
+        key = frozenset(indices)
+        if len(indices) < 3 or len(key) != len(indices) or key in self.face_set:
+            return False
+        self.face_set.add(key)
+        self.faces.append(tuple(indices))
+        return True
+
+    def unflushed_coords(self):
+        """Returns the (N, 3) world-space coordinates of the vertices added since the last flush().
+
+        They are not in the mesh yet, so the snap index cannot see them.
+        """
+        coords = np.array(self.coords[self.flushed_vertices:], dtype=np.float64).reshape(-1, 3)
+        matrix = np.array(self.obj.matrix_world, dtype=np.float64)
+        return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+    def flush(self):
+        """Writes the buffered geometry to the object's mesh in one pass."""
+        mesh = self.obj.data
+        mesh.clear_geometry()
+        mesh.from_pydata(self.coords, self.edges, self.faces)
+        mesh.update()
+        self.pending_edges = 0
+        self.flushed_vertices = len(self.coords)
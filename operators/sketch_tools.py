@@ -1,13 +1,26 @@
 # --- File: operators/sketch_tools.py ---
 import bpy
-import bmesh
 import gpu
 import blf
 import math
-from mathutils import Vector
+import time
 from gpu_extras.batch import batch_for_shader
 from bpy_extras.view3d_utils import location_3d_to_region_2d
-from ..utils import mouse_to_plane_coord, draw_circle_3d, draw_text_2d # Assuming these are defined in your utils.py
+from .snap_index import snap_index
+from .sketch_buffer import SketchBuffer, MERGE_DISTANCE
+from ..utils import mouse_to_plane_coord, draw_text_2d, unit_circle # Assuming these are defined in your utils.py
+from .. import profiling
+
+# Mouse moves are coalesced and the preview is refreshed on a timer at this rate.
+PREVIEW_INTERVAL = 1 / 60
+
+# Radius in pixels and segment count of the circle drawn around a snapped vertex.
+SNAP_INDICATOR_RADIUS = 8
+SNAP_INDICATOR_SEGMENTS = 12
+
+def _snap_circle_batch(shader):
+    """Returns a LINE_STRIP batch of the unit circle used for the snap indicator."""
+    return batch_for_shader(shader, 'LINE_STRIP', {"pos": unit_circle(SNAP_INDICATOR_SEGMENTS)})
 
 class SketcherModalBase(bpy.types.Operator):
     """Base class for modal sketching operators."""
@@ -15,9 +28,14 @@ class SketcherModalBase(bpy.types.Operator):
 
     def invoke(self, context, event):
         self.active = True
+        self.preview_pending = False # A mouse move (or unfinished snap) waits for the next preview tick
+        self.snap_complete = True
         # Add draw handler for post-view drawing (3D space)
         # Corrected: bpy.types.SpaceView3D (capital D)
         self.draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_callback_px, (context,), 'WINDOW', 'POST_VIEW')
+        # Screen-space overlays such as the snap indicator are drawn in region pixels
+        self.draw_handle_overlay = bpy.types.SpaceView3D.draw_handler_add(self.draw_callback_overlay, (context,), 'WINDOW', 'POST_PIXEL')
+        self.preview_timer = context.window_manager.event_timer_add(PREVIEW_INTERVAL, window=context.window)
         # Add modal handler to capture events
         context.window_manager.modal_handler_add(self)
         # Temporarily disabled cursor set/reset due to potential errors in some Blender versions
@@ -30,17 +48,39 @@ class SketcherModalBase(bpy.types.Operator):
         context.area.header_text_set(None) # Clear header text
         if self.draw_handle:
             bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle, 'WINDOW')
+        if getattr(self, "draw_handle_overlay", None):
+            bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle_overlay, 'WINDOW')
+            self.draw_handle_overlay = None
+        if getattr(self, "preview_timer", None):
+            context.window_manager.event_timer_remove(self.preview_timer)
+            self.preview_timer = None
         self.active = False
+        # Write out any segments still held in the in-session buffer
+        sketch_buffer = getattr(self, "sketch_buffer", None)
+        if sketch_buffer and sketch_buffer.pending_edges:
+            sketch_buffer.flush()
+        self.sketch_buffer = None
         # Reset state variables for the next invocation
         self.points = []
         self.current_blender_object = None
         self.is_first_point = True
         self.is_drawing_polyline = False
 
-    def get_snapped_point(self, context, event):
-        """Calculates the 3D mouse position with snapping (vertex and grid)."""
+    def draw_callback_overlay(self, context):
+        """Draws screen-space overlays; subclasses override it."""
+        pass
+
+    def get_snapped_point(self, context, event, deadline=None):
+        """Calculates the 3D mouse position with snapping (vertex and grid).
+
+        With a deadline (a time.perf_counter() value) vertex snapping only
+        uses as much of the snap index as could be updated in time, or is
+        skipped once the deadline has passed. self.snap_complete is False
+        when the result is such a coarse one and should be refined later.
+        """
         settings = context.scene.scene_cad_settings # Assuming a custom scene property group for CAD settings
         snapped_vertex_pos = None
+        self.snap_complete = True
 
         # Get raw 3D mouse position on the working plane
         temp_mouse_pos = mouse_to_plane_coord(context, event)
@@ -48,28 +88,17 @@ class SketcherModalBase(bpy.types.Operator):
             return None, None # Mouse not over 3D view or plane not defined
 
         # Vertex Snapping
-        if settings.use_vertex_snap:
+        if settings.use_vertex_snap and deadline is not None and time.perf_counter() > deadline:
+            # Out of frame budget: fall back to grid snapping this time round
+            self.snap_complete = False
+        elif settings.use_vertex_snap:
             snap_threshold_px = 10 # Pixels threshold for snapping
-            best_dist_sq = snap_threshold_px**2 # Squared distance for performance
-            depsgraph = context.evaluated_depsgraph_get() # Get dependency graph for evaluated mesh data
-
-            # Iterate visible mesh objects to find snap candidates
-            for obj in context.visible_objects:
-                if obj.type == 'MESH':
-                    world_matrix = obj.matrix_world # Object's world transformation
-                    mesh = obj.evaluated_get(depsgraph).to_mesh() # Get mesh data (evaluated for modifiers)
-                    # Iterate vertices of the mesh
-                    for v in mesh.vertices:
-                        v_world = world_matrix @ v.co # Vertex position in world space
-                        # Convert 3D world position to 2D screen position
-                        v_2d = location_3d_to_region_2d(context.region, context.region_data, v_world)
-                        if v_2d:
-                            # Calculate squared distance from mouse to vertex on screen
-                            dist_sq = (v_2d.x - event.mouse_region_x)**2 + (v_2d.y - event.mouse_region_y)**2
-                            if dist_sq < best_dist_sq:
-                                best_dist_sq = dist_sq
-                                snapped_vertex_pos = v_world # Store the snapped 3D position
-                    # mesh.free_copy() # Free the temporary mesh copy - REMOVED: 'Mesh' object has no attribute 'free_copy' in Blender 4.x
+            # Vertices of the sketch being drawn that are still only in the buffer
+            sketch_buffer = getattr(self, "sketch_buffer", None)
+            extra_coords = sketch_buffer.unflushed_coords() if sketch_buffer else None
+            # Candidates are projected and bucketed once per view/depsgraph change, see snap_index.py
+            snapped_vertex_pos = snap_index.find_nearest(context, event.mouse_region_x, event.mouse_region_y, snap_threshold_px, deadline, extra_coords)
+            self.snap_complete = snap_index.is_complete
 
             if snapped_vertex_pos:
                 # If a vertex was snapped, return its world position as both actual and snapped
@@ -90,6 +119,9 @@ class SKETCH_OT_draw_line(SketcherModalBase):
     bl_label = "Draw Line"
     bl_description = "Draws lines and polylines with snapping."
 
+    # Long polylines are written to the mesh every this many edges rather than per click
+    sketch_flush_interval = 256
+
     def invoke(self, context, event):
         # Initialize state for line/polyline drawing
         self.points = [] # Stores 3D coordinates of the polyline vertices
@@ -97,12 +129,15 @@ class SKETCH_OT_draw_line(SketcherModalBase):
         self.snapped_vertex_pos = None # 3D position of snapped vertex, if any
         
         # Drawing batches for GPU rendering
-        self.batch_line = None
-        self.batch_snap = None
+        self.batch_line = None # Committed points, rebuilt once per click
+        self.batch_rubber_band = None # Last point to the cursor, rebuilt per preview update
+        self.snap_2d = None # Region position of the snapped vertex, if any
         self.shader = gpu.shader.from_builtin('UNIFORM_COLOR') # Generic shader for uniform color
+        self.batch_snap = _snap_circle_batch(self.shader) # Unit circle, placed and scaled with gpu.matrix
 
         # New state variables for continuous drawing logic
         self.current_blender_object = None # The bpy.types.Object we are currently drawing into
+        self.sketch_buffer = None # In-session vertices/edges of current_blender_object, see sketch_buffer.py
         self.is_first_point = True # True if we are waiting for the very first point of a new line/polyline session
         self.is_drawing_polyline = False # True if Shift is held and we are continuously adding segments
 
@@ -113,6 +148,18 @@ class SKETCH_OT_draw_line(SketcherModalBase):
         if not self.active:
             return {'FINISHED'}
 
+        # Mouse moves only record that the preview is out of date; the preview
+        # tick below then works from the latest position, however many moves
+        # arrived in between.
+        if event.type in {'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE'}:
+            self.preview_pending = True
+            return {'RUNNING_MODAL'}
+
+        if event.type == 'TIMER':
+            if self.preview_pending:
+                self._refresh_preview(context, event)
+            return {'PASS_THROUGH'}
+
         # Get current 3D mouse position, potentially snapped
         self.mouse_pos_3d, self.snapped_vertex_pos = self.get_snapped_point(context, event)
         if self.mouse_pos_3d is None:
@@ -124,38 +171,10 @@ class SKETCH_OT_draw_line(SketcherModalBase):
         # Update drawing batches for the preview
         self._update_drawing_batches(context)
 
-        # Handle user input
+        # Handle user input. Only clicks and preview refreshes are profiled;
+        # the preview timer ticks at 60 Hz and would crowd out everything else.
         if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
-            if self.is_first_point:
-                # This is the very first point of a new line/polyline session
-                self.points.append(self.mouse_pos_3d)
-                self.is_first_point = False # No longer the first point
-                
-                # Ensure we have a NEW object to draw into for a fresh session
-                self._create_new_drawing_object(context)
-                
-                context.area.header_text_set("Line: Click for end point. SHIFT+Click to continue polyline. ESC to cancel.")
-                return {'RUNNING_MODAL'}
-            else:
-                # This is a subsequent point (either end of single line or continuation of polyline)
-                prev_point = self.points[-1] # Get the previous point
-                self.points.append(self.mouse_pos_3d) # Add the new point
-
-                # Add the new edge segment to the Blender object
-                self._add_edge_to_object(context, self.current_blender_object, prev_point, self.mouse_pos_3d)
-
-                if event.shift:
-                    # User is holding Shift, continue drawing polyline
-                    self.is_drawing_polyline = True
-                    context.area.header_text_set(
-                        f"Polyline: SHIFT+Click to continue, Click to finish. ESC to cancel. Points: {len(self.points)}"
-                    )
-                    return {'RUNNING_MODAL'}
-                else:
-                    # User released Shift or didn't press it for the final click, finish drawing
-                    self.is_drawing_polyline = False
-                    self._finalise_drawing(context) # Perform final selection and cleanup
-                    return {'FINISHED'}
+            return self._handle_click(context, event)
 
         elif event.type in {'RIGHTMOUSE', 'ESC'}:
             # Cancel drawing
@@ -164,28 +183,86 @@ class SKETCH_OT_draw_line(SketcherModalBase):
 
         return {'RUNNING_MODAL'}
 
+    @profiling.profiled
+    def _handle_click(self, context, event):
+        """Commits a clicked point: starts a new line, adds a segment or finishes the drawing."""
+        if self.is_first_point:
+            # This is the very first point of a new line/polyline session
+            self.points.append(self.mouse_pos_3d)
+            self.is_first_point = False # No longer the first point
+            self._update_committed_batch()
+            self._update_drawing_batches(context)
+            
+            # Ensure we have a NEW object to draw into for a fresh session
+            self._create_new_drawing_object(context)
+            
+            context.area.header_text_set("Line: Click for end point. SHIFT+Click to continue polyline. ESC to cancel.")
+            return {'RUNNING_MODAL'}
+        else:
+            # This is a subsequent point (either end of single line or continuation of polyline)
+            prev_point = self.points[-1] # Get the previous point
+            self.points.append(self.mouse_pos_3d) # Add the new point
+            self._update_committed_batch()
+            self._update_drawing_batches(context)
+
+            # Add the new edge segment to the Blender object
+            self._add_edge_to_object(context, self.current_blender_object, prev_point, self.mouse_pos_3d)
+
+            if event.shift:
+                # User is holding Shift, continue drawing polyline
+                self.is_drawing_polyline = True
+                context.area.header_text_set(
+                    f"Polyline: SHIFT+Click to continue, Click to finish. ESC to cancel. Points: {len(self.points)}"
+                )
+                return {'RUNNING_MODAL'}
+            else:
+                # User released Shift or didn't press it for the final click, finish drawing
+                self.is_drawing_polyline = False
+                self._finalise_drawing(context) # Perform final selection and cleanup
+                return {'FINISHED'}
+
+    @profiling.profiled
+    def _refresh_preview(self, context, event):
+        """Updates the preview for the current mouse position within the scene's frame budget.
+
+        Grid snapping and the preview are always updated; vertex snapping
+        gets whatever is left of the budget. If it could not finish, the
+        preview stays pending and the next tick refines it.
+        """
+        budget = context.scene.scene_cad_settings.sketch_frame_budget_ms / 1000
+        deadline = time.perf_counter() + budget
+        mouse_pos_3d, snapped_vertex_pos = self.get_snapped_point(context, event, deadline)
+        self.preview_pending = not self.snap_complete
+        if mouse_pos_3d is None:
+            return
+        self.mouse_pos_3d, self.snapped_vertex_pos = mouse_pos_3d, snapped_vertex_pos
+        self._update_drawing_batches(context)
+        context.area.tag_redraw()
+
     def _update_drawing_batches(self, context):
-        """Updates the GPU drawing batches for line preview and snap indicator."""
-        # Snapping indicator
+        """Updates the parts of the preview that follow the cursor.
+
+        That is only the rubber-band segment from the last point to the
+        cursor and the position of the snap indicator; the committed points
+        have their own batch, see _update_committed_batch().
+        """
+        # Snapping indicator: the circle batch is fixed, only its position changes
+        self.snap_2d = None
         if self.snapped_vertex_pos:
-            # Convert 3D snapped position to 2D screen position for drawing circle
             p_2d = location_3d_to_region_2d(context.region, context.region_data, self.snapped_vertex_pos)
             if p_2d:
-                # Draw a circle around the snapped point
-                circle_verts = draw_circle_3d(p_2d.to_3d(), 8, Vector((0,0,1)), segments=12)
-                self.batch_snap = batch_for_shader(self.shader, 'LINE_STRIP', {"pos": circle_verts})
-            else:
-                self.batch_snap = None
+                self.snap_2d = (p_2d.x, p_2d.y)
+
+        # Rubber band from the last committed point to the cursor
+        if self.points and self.mouse_pos_3d is not None:
+            self.batch_rubber_band = batch_for_shader(self.shader, 'LINES', {"pos": [self.points[-1], self.mouse_pos_3d]})
         else:
-            self.batch_snap = None
-
-        # Line/Polyline preview
-        if len(self.points) >= 1:
-            # Create a list of all points including the current mouse position for preview
-            line_verts = list(self.points) # Copy existing points
-            line_verts.append(self.mouse_pos_3d) # Add current mouse position as the last point
-            # Use LINE_STRIP to connect all points sequentially
-            self.batch_line = batch_for_shader(self.shader, 'LINE_STRIP', {"pos": line_verts})
+            self.batch_rubber_band = None
+
+    def _update_committed_batch(self):
+        """Rebuilds the batch of committed points; called once per click, never per mouse move."""
+        if len(self.points) >= 2:
+            self.batch_line = batch_for_shader(self.shader, 'LINE_STRIP', {"pos": self.points})
         else:
             self.batch_line = None
 
@@ -195,10 +272,12 @@ class SKETCH_OT_draw_line(SketcherModalBase):
         obj = bpy.data.objects.new("CAD_Sketch", mesh_data)
         context.collection.objects.link(obj)
         self.current_blender_object = obj
+        self.sketch_buffer = SketchBuffer(obj)
         
         # Ensure the object is in OBJECT mode for bmesh operations
         if bpy.ops.object.mode_set.poll():
-            bpy.ops.object.mode_set(mode='OBJECT')
+            with profiling.phase("mode_switch"):
+                bpy.ops.object.mode_set(mode='OBJECT')
         
         # Select the new object and make it active
         bpy.ops.object.select_all(action='DESELECT')
@@ -217,33 +296,20 @@ class SKETCH_OT_draw_line(SketcherModalBase):
             # print("Skipping edge creation: points are too close.") # Optional: for debugging
             return # Do not create an edge if points are coincident
 
-        # Get bmesh from object data
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-
-        # Find existing vertices or create new ones for p1 and p2
-        # Use a small tolerance for finding existing vertices
-        v1 = next((v for v in bm.verts if (v.co - p1).length < 0.0001), None)
-        v2 = next((v for v in bm.verts if (v.co - p2).length < 0.0001), None)
-
-        if not v1: v1 = bm.verts.new(p1)
-        if not v2: v2 = bm.verts.new(p2)
-
-        # Add the edge if it doesn't already exist
-        # Check both (v1, v2) and (v2, v1) for existing edges
-        if not any(e for e in bm.edges if (e.verts[0] == v1 and e.verts[1] == v2) or (e.verts[0] == v2 and e.verts[1] == v1)):
-            bm.edges.new((v1, v2))
-        
-        # Remove duplicate vertices that might have been created by snapping or small inaccuracies
-        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
-        
-        # This operation helps ensure valid geometry, especially for faces, though not strictly needed for just edges
-        # bmesh.ops.contextual_create(bm, geom=bm.edges) 
-        
-        # Write changes back to the mesh data
-        bm.to_mesh(obj.data)
-        bm.free() # Important: free the bmesh
-        obj.data.update() # Update mesh data in Blender
+        # Segments go into the in-session buffer; the mesh is rewritten in batches
+        sketch_buffer = self._get_sketch_buffer(obj)
+        sketch_buffer.add_edge(p1, p2)
+        if sketch_buffer.pending_edges >= self.sketch_flush_interval:
+            sketch_buffer.flush()
+
+    def _get_sketch_buffer(self, obj):
+        """Returns the in-session buffer for obj, starting a new one if the target changed."""
+        sketch_buffer = getattr(self, "sketch_buffer", None)
+        if sketch_buffer is None or sketch_buffer.obj != obj:
+            if sketch_buffer and sketch_buffer.pending_edges:
+                sketch_buffer.flush()
+            sketch_buffer = self.sketch_buffer = SketchBuffer(obj)
+        return sketch_buffer
 
     def _finalise_drawing(self, context):
         """Finalizes the drawing operation, selects the object, and cleans up."""
@@ -257,8 +323,8 @@ class SKETCH_OT_draw_line(SketcherModalBase):
                 
                 # Only add a closing edge if the first and last points are distinct
                 # (i.e., the polyline isn't already closed by the last click, or degenerate)
-                # Use a small tolerance similar to remove_doubles
-                if (last_point - first_point).length > 0.0001: # Use a small epsilon
+                # Use the same tolerance the sketch buffer welds with
+                if (last_point - first_point).length > MERGE_DISTANCE:
                     # Add an edge between the last and first point to close the loop
                     self._add_edge_to_object(context, self.current_blender_object, last_point, first_point)
 
@@ -281,52 +347,35 @@ class SKETCH_OT_draw_line(SketcherModalBase):
             print("Cannot create face: Need at least 3 points.")
             return
 
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-
-        # Get existing vertices or create new ones for the face
-        face_verts = []
-        for p in points:
-            v = next((v for v in bm.verts if (v.co - p).length < 0.0001), None)
-            if not v:
-                v = bm.verts.new(p)
-            face_verts.append(v)
-        
-        try:
-            # Check if a face already exists with these vertices to prevent duplicates
-            existing_face = None
-            for f in bm.faces:
-                if len(f.verts) == len(face_verts) and all(v in f.verts for v in face_verts):
-                    existing_face = f
-                    break
-            
-            if not existing_face:
-                bm.faces.new(face_verts)
-        except ValueError as e:
-            print(f"Warning: Could not create face. Geometry might be non-planar or self-intersecting. Error: {e}")
-            # This can happen if points are not perfectly planar or form a complex polygon
-            # For simple polygons, bmesh.faces.new should work.
-            # For complex cases, bmesh.ops.contextual_create(geom=edges_of_loop) might be needed.
-
-        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
-        bm.to_mesh(obj.data)
-        bm.free()
-        obj.data.update()
+        # Welding and duplicate-face checks go through the buffer's spatial hash
+        sketch_buffer = self._get_sketch_buffer(obj)
+        if not sketch_buffer.add_face(points):
+            print("Warning: Could not create face. The points are degenerate or the face already exists.")
+            return
+        sketch_buffer.flush()
 
 
     def draw_callback_px(self, context):
-        """Draws the snap indicator and line preview in the 3D view."""
-        # Draw snapping indicator
-        if self.batch_snap:
-            self.shader.bind()
-            self.shader.uniform_float("color", (0.1, 0.8, 0.1, 1.0)) # Green color for snap
-            self.batch_snap.draw(self.shader)
-
-        # Draw the line/polyline preview
+        """Draws the line preview in the 3D view."""
+        if not (self.batch_line or self.batch_rubber_band):
+            return
+        self.shader.bind()
+        self.shader.uniform_float("color", (0.1, 0.1, 0.8, 1.0)) # Blue color for line
         if self.batch_line:
-            self.shader.bind()
-            self.shader.uniform_float("color", (0.1, 0.1, 0.8, 1.0)) # Blue color for line
             self.batch_line.draw(self.shader)
+        if self.batch_rubber_band:
+            self.batch_rubber_band.draw(self.shader)
+
+    def draw_callback_overlay(self, context):
+        """Draws the snap indicator around the snapped vertex, in region pixels."""
+        if self.snap_2d is None:
+            return
+        self.shader.bind()
+        self.shader.uniform_float("color", (0.1, 0.8, 0.1, 1.0)) # Green color for snap
+        with gpu.matrix.push_pop():
+            gpu.matrix.translate(self.snap_2d)
+            gpu.matrix.scale_uniform(SNAP_INDICATOR_RADIUS)
+            self.batch_snap.draw(self.shader)
 
 # --- Registration ---
 classes = (
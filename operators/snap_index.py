@@ -0,0 +1,291 @@
+# --- File: operators/snap_index.py ---
+import bpy
+import math
+import time
+import numpy as np
+from mathutils import Vector
+from bpy.app.handlers import persistent
+from ..utils import mesh_vertex_coords, project_points_to_region, nearest_point_in_region
+
+# Vertices projected between two deadline checks, so one large mesh cannot blow the frame budget.
+PROJECT_CHUNK = 65536
+
+
+class EvaluatedVertexCache:
+    """World-space vertex arrays of evaluated meshes, one entry per object.
+
+    Entries are only invalidated from the depsgraph handler below: a geometry
+    update drops the entry, a transform-only update keeps the local
+    coordinates and just re-applies the new world matrix. The evaluated mesh
+    is released with to_mesh_clear() as soon as its coordinates are copied.
+    """
+
+    def __init__(self):
+        self.entries = {} # object name -> [local coords (N, 3), world coords (N, 3) or None]
+
+    def clear(self):
+        self.entries.clear()
+
+    def discard(self, name):
+        self.entries.pop(name, None)
+
+    def transform_changed(self, name):
+        entry = self.entries.get(name)
+        if entry is not None:
+            entry[1] = None
+
+    def retain(self, names):
+        """Drops entries for objects that are no longer in names."""
+        for name in [name for name in self.entries if name not in names]:
+            del self.entries[name]
+
+    def get(self, obj, depsgraph):
+        """Returns the (N, 3) float32 world-space vertex coordinates of obj."""
+        entry = self.entries.get(obj.name)
+        if entry is None:
+            obj_eval = obj.evaluated_get(depsgraph)
+            try:
+                local = mesh_vertex_coords(obj_eval.to_mesh())
+            finally:
+                obj_eval.to_mesh_clear()
+            entry = self.entries[obj.name] = [local, None]
+        if entry[1] is None:
+            matrix = np.array(obj.matrix_world, dtype=np.float32)
+            entry[1] = entry[0] @ matrix[:3, :3].T + matrix[:3, 3]
+        return entry[1]
+
+
+class SnapIndex:
+    """Screen-space grid of vertex snap candidates for the sketch tools.
+
+    Vertices are projected once per view and bucketed into square cells the
+    size of the snap threshold, so a query only visits the few cells around
+    the mouse. A view change re-projects everything; a depsgraph update only
+    re-projects the objects it touched. Projection reads from the shared
+    EvaluatedVertexCache, so panning or zooming never re-evaluates a mesh.
+
+    Candidates live in flat NumPy arrays sorted by cell key, so a column of
+    cells is one contiguous slice found with searchsorted.
+
+    Queries may pass a deadline (a time.perf_counter() value). Vertices are
+    projected in chunks of PROJECT_CHUNK with the deadline checked between
+    chunks; whatever could not be projected in time is left pending and
+    is_complete is False, so the caller can take the coarse answer now and
+    ask again later.
+    """
+
+    def __init__(self, cell_size=10):
+        self.cell_size = cell_size
+        self.view_key = None
+        self.objects = {} # object name -> (region coords (N, 2), world coords (N, 3))
+        self.partial = {} # object name -> (next vertex, [(region coords, world coords)] per chunk) while projecting
+        self.dirty_objects = set()
+        self.needs_merge = True
+        self.is_complete = True
+        self.stride = 1
+        self._clear_merged()
+
+    def _clear_merged(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.points_2d = np.empty((0, 2))
+        self.world_coords = np.empty((0, 3), dtype=np.float32)
+
+    def invalidate(self):
+        """Drops every projected candidate; the next query rebuilds from scratch."""
+        self.view_key = None
+        self.objects.clear()
+        self.partial.clear()
+        self.dirty_objects.clear()
+        self.needs_merge = True
+        self._clear_merged()
+
+    def mark_dirty(self, name):
+        """Flags a single object for re-projection on the next query."""
+        self.dirty_objects.add(name)
+
+    def _cell_keys(self, cx, cy):
+        # Cells start two columns/rows outside the region, see the margin in _project_object.
+        return (cx + 2) * self.stride + (cy + 2)
+
+    def _project_object(self, context, depsgraph, obj, deadline=None):
+        """Projects the vertices of obj chunk by chunk. Returns True once all of them are done.
+
+        At least one chunk is projected per call. If the deadline passes
+        before the last one, the chunks so far are kept as obj's candidates
+        and the next call continues where this one stopped.
+        """
+        region = context.region
+        coords = vertex_cache.get(obj, depsgraph)
+        start, parts = self.partial.pop(obj.name, (0, []))
+        # The mouse is always inside the region, so anything further out than
+        # one cell can never be within the snap threshold.
+        margin = self.cell_size
+        first = start
+        while start < len(coords):
+            if start > first and deadline is not None and time.perf_counter() > deadline:
+                self.partial[obj.name] = (start, parts)
+                break
+            chunk = coords[start:start + PROJECT_CHUNK]
+            points_2d, visible = project_points_to_region(region, context.region_data, chunk)
+            keep = (
+                visible
+                & (points_2d[:, 0] >= -margin) & (points_2d[:, 0] <= region.width + margin)
+                & (points_2d[:, 1] >= -margin) & (points_2d[:, 1] <= region.height + margin)
+            )
+            parts.append((points_2d[keep], chunk[keep]))
+            start += PROJECT_CHUNK
+
+        if parts:
+            self.objects[obj.name] = (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]))
+        else:
+            self.objects[obj.name] = (np.empty((0, 2)), coords[:0])
+        return obj.name not in self.partial
+
+    def _merge(self):
+        """Concatenates the per-object candidates and sorts them by cell."""
+        if not self.objects:
+            self._clear_merged()
+            return
+        points_2d = np.concatenate([entry[0] for entry in self.objects.values()])
+        world_coords = np.concatenate([entry[1] for entry in self.objects.values()])
+
+        cells = np.floor(points_2d / self.cell_size).astype(np.int64)
+        keys = self._cell_keys(cells[:, 0], cells[:, 1])
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.points_2d = points_2d[order]
+        self.world_coords = world_coords[order]
+
+    def _sync(self, context, deadline=None):
+        """Brings the index up to date with the current view and scene, or as far as the deadline allows."""
+        region = context.region
+        rv3d = context.region_data
+        view_key = (region.width, region.height, tuple(tuple(row) for row in rv3d.perspective_matrix))
+        if view_key != self.view_key:
+            self.invalidate()
+            self.view_key = view_key
+            self.stride = int(region.height // self.cell_size) + 5
+
+        visible = {obj.name: obj for obj in context.visible_objects if obj.type == 'MESH'}
+        stale = [name for name in self.objects if name not in visible]
+        pending = [
+            name for name in visible
+            if name not in self.objects or name in self.dirty_objects or name in self.partial
+        ]
+        self.is_complete = True
+        if stale or pending:
+            for name in stale:
+                del self.objects[name]
+                self.partial.pop(name, None)
+            self.dirty_objects.intersection_update(visible)
+            self.needs_merge = self.needs_merge or bool(stale)
+            vertex_cache.retain(visible)
+            depsgraph = context.evaluated_depsgraph_get()
+            for i, name in enumerate(pending):
+                # At least one chunk is projected per query, so refinement always progresses
+                if i and deadline is not None and time.perf_counter() > deadline:
+                    # The rest stays pending (unprojected or dirty) for the next query
+                    self.is_complete = False
+                    break
+                if name in self.dirty_objects:
+                    # Changed geometry restarts any projection that was under way
+                    self.dirty_objects.discard(name)
+                    self.partial.pop(name, None)
+                done = self._project_object(context, depsgraph, visible[name], deadline)
+                self.needs_merge = True
+                if not done:
+                    self.is_complete = False
+                    break
+
+        if self.needs_merge:
+            self._merge()
+            self.needs_merge = False
+
+    def find_nearest(self, context, mouse_x, mouse_y, threshold_px, deadline=None, extra_coords=None):
+        """Returns the world position of the closest candidate within threshold_px, or None.
+
+        With a deadline the search may run on a partly updated index; check
+        is_complete afterwards. extra_coords is an optional (N, 3) array of
+        world-space points that are not in any mesh yet, such as the unwritten
+        vertices of the sketch being drawn. There are few of them, so they are
+        projected and searched directly on every query.
+        """
+        self._sync(context, deadline)
+        found = self._nearest_indexed(mouse_x, mouse_y, threshold_px)
+        if extra_coords is not None and len(extra_coords):
+            points_2d, visible = project_points_to_region(context.region, context.region_data, extra_coords)
+            best = nearest_point_in_region(points_2d, mouse_x, mouse_y, threshold_px, visible)
+            if best is not None and (found is None or _dist_sq(points_2d[best], mouse_x, mouse_y) < _dist_sq(found[0], mouse_x, mouse_y)):
+                found = (points_2d[best], extra_coords[best])
+        if found is None:
+            return None
+        return Vector(found[1])
+
+    def _nearest_indexed(self, mouse_x, mouse_y, threshold_px):
+        """Returns (region coords, world coords) of the closest indexed candidate within threshold_px, or None."""
+        if not len(self.keys):
+            return None
+
+        cx = math.floor(mouse_x / self.cell_size)
+        cy = math.floor(mouse_y / self.cell_size)
+        reach = math.ceil(threshold_px / self.cell_size)
+        y_lo = max(cy - reach, -2)
+        y_hi = min(cy + reach, self.stride - 3)
+        slices = []
+        for ix in range(cx - reach, cx + reach + 1):
+            lo = np.searchsorted(self.keys, self._cell_keys(ix, y_lo), side='left')
+            hi = np.searchsorted(self.keys, self._cell_keys(ix, y_hi), side='right')
+            if hi > lo:
+                slices.append(np.arange(lo, hi))
+        if not slices:
+            return None
+
+        candidates = np.concatenate(slices)
+        best = nearest_point_in_region(self.points_2d[candidates], mouse_x, mouse_y, threshold_px)
+        if best is None:
+            return None
+        return self.points_2d[candidates[best]], self.world_coords[candidates[best]]
+
+
+def _dist_sq(point_2d, x, y):
+    return (point_2d[0] - x)**2 + (point_2d[1] - y)**2
+
+
+# Shared by every sketch operator so both survive between invocations.
+vertex_cache = EvaluatedVertexCache()
+snap_index = SnapIndex()
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """Invalidates cached vertices and marks changed objects for re-projection."""
+    for update in depsgraph.updates:
+        if not isinstance(update.id, bpy.types.Object):
+            continue
+        name = update.id.name
+        if update.is_updated_geometry:
+            vertex_cache.discard(name)
+        elif update.is_updated_transform:
+            vertex_cache.transform_changed(name)
+        else:
+            continue
+        snap_index.mark_dirty(name)
+
+@persistent
+def _on_load_post(*args):
+    """Forgets the previous file's candidates."""
+    vertex_cache.clear()
+    snap_index.invalidate()
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    vertex_cache.clear()
+    snap_index.invalidate()
@@ -1,5 +1,6 @@
 # --- File: operators/view_navigator.py ---
 import bpy
+from .. import profiling
 
 class VIEW_OT_set_view_axis(bpy.types.Operator):
     """Sets the 3D view to a specified axis using Blender's internal tools."""
@@ -9,6 +10,7 @@ class VIEW_OT_set_view_axis(bpy.types.Operator):
 
     view_type: bpy.props.StringProperty()
 
+    @profiling.profiled
     def execute(self, context):
         # Find the first available 3D Viewport area to run the operator in.
         area = next((a for a in context.screen.areas if a.type == 'VIEW_3D'), None)
@@ -0,0 +1,155 @@
+# --- File: profiling.py ---
+import bpy
+import sys
+import time
+from collections import deque
+from functools import wraps
+from bpy.app.handlers import persistent
+
+# Number of timings kept; older ones are dropped as new ones come in.
+RING_SIZE = 4096
+
+# Toggled from SceneCADSettings.profiling_enabled. While False, profiled
+# callbacks and phase() only pay for a global lookup.
+enabled = False
+
+records = deque(maxlen=RING_SIZE) # (label, seconds, allocated blocks delta)
+_stack = [] # names of the phases currently running, outermost first
+
+
+def set_enabled(value):
+    global enabled
+    enabled = bool(value)
+    _stack.clear()
+
+
+def clear():
+    records.clear()
+
+
+class _Phase:
+    """Times a block and records it under the path of the enclosing phases, e.g. 'MESH_OT_create_hole.execute/boolean'."""
+
+    __slots__ = ("name", "label", "start", "blocks")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.label = "/".join(_stack)
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        records.append((self.label, seconds, sys.getallocatedblocks() - self.blocks))
+        if _stack:
+            _stack.pop()
+        return False
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name):
+    """Returns a context manager that records the wall time and allocations of its block."""
+    if not enabled:
+        return _NULL_PHASE
+    return _Phase(name)
+
+
+def profiled(func):
+    """Records every call of func as a phase named after its qualified name.
+
+    Blender checks the argument count of operator callbacks when a class is
+    registered, so execute(self, context) and modal/invoke(self, context,
+    event) get wrappers with exactly that signature.
+    """
+    label = func.__qualname__
+    code = func.__code__
+    arg_names = code.co_varnames[:code.co_argcount]
+
+    if arg_names == ('self', 'context'):
+        @wraps(func)
+        def wrapper(self, context):
+            if not enabled:
+                return func(self, context)
+            with _Phase(label):
+                return func(self, context)
+    elif arg_names == ('self', 'context', 'event'):
+        @wraps(func)
+        def wrapper(self, context, event):
+            if not enabled:
+                return func(self, context, event)
+            with _Phase(label):
+                return func(self, context, event)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Phase(label):
+                return func(*args, **kwargs)
+    return wrapper
+
+
+def _percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summary():
+    """Returns per-label statistics of the recorded timings, most total time first.
+
+    Each entry is a dict with label, count, p50_ms, p95_ms, total_ms and
+    mean_blocks (allocated blocks left behind per call, on average).
+    """
+    by_label = {}
+    for label, seconds, blocks in records:
+        entry = by_label.setdefault(label, ([], []))
+        entry[0].append(seconds)
+        entry[1].append(blocks)
+
+    rows = []
+    for label, (times, blocks) in by_label.items():
+        times.sort()
+        rows.append({
+            "label": label,
+            "count": len(times),
+            "p50_ms": _percentile(times, 0.5) * 1000,
+            "p95_ms": _percentile(times, 0.95) * 1000,
+            "total_ms": sum(times) * 1000,
+            "mean_blocks": sum(blocks) / len(blocks),
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+@persistent
+def _on_load_post(*args):
+    """Follows the profiling switch of the newly loaded file."""
+    clear()
+    scene = bpy.context.scene
+    set_enabled(scene is not None and scene.scene_cad_settings.profiling_enabled)
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    set_enabled(False)
+    clear()
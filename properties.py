@@ -1,5 +1,7 @@
 # --- File: properties.py ---
 import bpy
+from .operators.regeneration import checkpoint_store, mark_feature_dirty
+from . import profiling
 
 # --- Update functions for Reference Images ---
 def update_ref_image_property(self, context):
@@ -74,6 +76,32 @@ def update_units_and_grid(self, context):
                     space.tag_redraw()
 
 
+def update_checkpoint_budget(self, context):
+    """ Resizes the feature checkpoint store, evicting snapshots if it shrank. """
+    checkpoint_store.set_budget(self.checkpoint_memory_mb * 1024 * 1024)
+
+
+def update_profiling_enabled(self, context):
+    """ Switches the timing of operators and draw callbacks on or off. """
+    profiling.set_enabled(self.profiling_enabled)
+
+
+def update_feature_parameter(self, context):
+    """ Marks the edited feature and everything downstream of it for a debounced rebuild. """
+    mark_feature_dirty(self)
+
+
+def update_feature_selection(self, context):
+    """ Forgets the element count stored for the old selection, then schedules a rebuild like any other parameter. """
+    self.selection_count = 0
+    mark_feature_dirty(self)
+
+
+class CADPatternPoint(bpy.types.PropertyGroup):
+    """A single hole centre of a point-based hole pattern, in the object's local space."""
+    co: bpy.props.FloatVectorProperty(name="Location", subtype='TRANSLATION')
+
+
 class CADFeature(bpy.types.PropertyGroup):
     """Properties for a single feature in the feature tree."""
     name: bpy.props.StringProperty(name="Feature Name")
@@ -84,54 +112,76 @@ class CADFeature(bpy.types.PropertyGroup):
             ('BEVEL', "Bevel", "Bevel operation"),
             ('INNER_RADIUS', "Inner Radius", "Inner Radius operation"),
             ('CREATE_HOLE', "Create Hole", "Create Hole operation"),
+            ('HOLE_PATTERN', "Hole Pattern", "Hole Pattern operation"),
             ('CREATE_GEAR', "Create Gear", "Create Gear operation"),
         ]
     )
+    is_dirty: bpy.props.BoolProperty(name="Needs Regeneration", default=False, description="A parameter of this feature or one it depends on changed since the last rebuild")
+    placement: bpy.props.FloatVectorProperty(name="Placement", size=(3, 3), subtype='MATRIX', default=((1, 0, 0), (0, 1, 0), (0, 0, 1)), description="The world axes in the object's local space when the feature was added; orients extrusions, hole cutters, hole patterns and inner radius offsets, so they stay put on the part when the object is moved")
+
+    # --- Element Scope (Extrude: faces, Bevel: edges) ---
+    selection_mode: bpy.props.EnumProperty(name="Scope", items=[('ALL', "All", "Operate on the whole mesh"), ('SELECTED', "Selection", "Operate on the elements stored with the feature")], default='ALL', update=update_feature_parameter)
+    selection_indices: bpy.props.StringProperty(name="Elements", description="Stored element indices as ranges, e.g. '0-3,7'", update=update_feature_selection)
+    selection_count: bpy.props.IntProperty(name="Element Count", default=0, min=0, description="Number of faces or edges the feature's input had when the selection was first applied; 0 until then")
 
     # --- Extrude Properties ---
-    extrude_depth: bpy.props.FloatProperty(name="Depth", default=1.0, subtype='DISTANCE')
+    extrude_depth: bpy.props.FloatProperty(name="Depth", default=1.0, subtype='DISTANCE', update=update_feature_parameter)
 
     # --- Bevel Properties ---
-    bevel_amount: bpy.props.FloatProperty(name="Amount", default=0.2, subtype='DISTANCE')
-    bevel_segments: bpy.props.IntProperty(name="Segments", default=4, min=1)
+    bevel_amount: bpy.props.FloatProperty(name="Amount", default=0.2, subtype='DISTANCE', update=update_feature_parameter)
+    bevel_segments: bpy.props.IntProperty(name="Segments", default=4, min=1, update=update_feature_parameter)
 
     # --- Inner Radius Properties ---
-    inner_radius_width: bpy.props.FloatProperty(name="Wall Thickness (X)", default=0.1, min=0.001, subtype='DISTANCE')
-    inner_radius_length: bpy.props.FloatProperty(name="Wall Thickness (Y)", default=0.1, min=0.001, subtype='DISTANCE')
-    inner_radius_height: bpy.props.FloatProperty(name="Wall Thickness (Z)", default=0.1, min=0.001, subtype='DISTANCE')
-    inner_radius_offset_x: bpy.props.FloatProperty(name="Offset X", default=0.0, subtype='DISTANCE')
-    inner_radius_offset_y: bpy.props.FloatProperty(name="Offset Y", default=0.0, subtype='DISTANCE')
-    inner_radius_offset_z: bpy.props.FloatProperty(name="Offset Z", default=0.0, subtype='DISTANCE')
-    inner_radius_rotation: bpy.props.FloatProperty(name="Rotation", default=0.0, subtype='ANGLE', unit='ROTATION')
+    inner_radius_width: bpy.props.FloatProperty(name="Wall Thickness (X)", default=0.1, min=0.001, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_length: bpy.props.FloatProperty(name="Wall Thickness (Y)", default=0.1, min=0.001, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_height: bpy.props.FloatProperty(name="Wall Thickness (Z)", default=0.1, min=0.001, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_offset_x: bpy.props.FloatProperty(name="Offset X", default=0.0, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_offset_y: bpy.props.FloatProperty(name="Offset Y", default=0.0, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_offset_z: bpy.props.FloatProperty(name="Offset Z", default=0.0, subtype='DISTANCE', update=update_feature_parameter)
+    inner_radius_rotation: bpy.props.FloatProperty(name="Rotation", default=0.0, subtype='ANGLE', unit='ROTATION', update=update_feature_parameter)
 
     # --- Create Hole Properties ---
-    hole_type: bpy.props.EnumProperty(name="Type", items=[('SIMPLE', "Simple", ""), ('COUNTERBORE', "Counterbore", ""), ('COUNTERSINK', "Countersink", "")], default='SIMPLE')
-    hole_diameter: bpy.props.FloatProperty(name="Diameter", default=0.005, min=0.0001, subtype='DISTANCE')
-    hole_depth: bpy.props.FloatProperty(name="Depth", default=0.01, min=0.0001, subtype='DISTANCE')
-    hole_cb_diameter: bpy.props.FloatProperty(name="CB Diameter", default=0.01, min=0.0001, subtype='DISTANCE')
-    hole_cb_depth: bpy.props.FloatProperty(name="CB Depth", default=0.002, min=0.0001, subtype='DISTANCE')
-    hole_cs_angle: bpy.props.FloatProperty(name="CS Angle", default=90.0, min=1.0, max=179.0, subtype='ANGLE')
+    hole_type: bpy.props.EnumProperty(name="Type", items=[('SIMPLE', "Simple", ""), ('COUNTERBORE', "Counterbore", ""), ('COUNTERSINK', "Countersink", "")], default='SIMPLE', update=update_feature_parameter)
+    hole_diameter: bpy.props.FloatProperty(name="Diameter", default=0.005, min=0.0001, subtype='DISTANCE', update=update_feature_parameter)
+    hole_depth: bpy.props.FloatProperty(name="Depth", default=0.01, min=0.0001, subtype='DISTANCE', update=update_feature_parameter)
+    hole_cb_diameter: bpy.props.FloatProperty(name="CB Diameter", default=0.01, min=0.0001, subtype='DISTANCE', update=update_feature_parameter)
+    hole_cb_depth: bpy.props.FloatProperty(name="CB Depth", default=0.002, min=0.0001, subtype='DISTANCE', update=update_feature_parameter)
+    hole_cs_angle: bpy.props.FloatProperty(name="CS Angle", default=90.0, min=1.0, max=179.0, subtype='ANGLE', update=update_feature_parameter)
+    hole_location: bpy.props.FloatVectorProperty(name="Location", subtype='TRANSLATION', description="Position of the hole in the object's local space, taken from the 3D cursor", update=update_feature_parameter)
+
+    # --- Hole Pattern Properties (the hole itself uses the Create Hole properties) ---
+    pattern_type: bpy.props.EnumProperty(name="Pattern", items=[('LINEAR', "Linear", ""), ('RECTANGULAR', "Rectangular", ""), ('POLAR', "Polar", ""), ('POINTS', "Points", "")], default='LINEAR', update=update_feature_parameter)
+    pattern_count_x: bpy.props.IntProperty(name="Count", default=4, min=1, update=update_feature_parameter)
+    pattern_count_y: bpy.props.IntProperty(name="Rows", default=2, min=1, update=update_feature_parameter)
+    pattern_spacing_x: bpy.props.FloatProperty(name="Spacing X", default=0.02, subtype='DISTANCE', update=update_feature_parameter)
+    pattern_spacing_y: bpy.props.FloatProperty(name="Spacing Y", default=0.02, subtype='DISTANCE', update=update_feature_parameter)
+    pattern_radius: bpy.props.FloatProperty(name="Radius", default=0.03, min=0.0, subtype='DISTANCE', update=update_feature_parameter)
+    pattern_start_angle: bpy.props.FloatProperty(name="Start Angle", default=0.0, subtype='ANGLE', unit='ROTATION', update=update_feature_parameter)
+    pattern_points: bpy.props.CollectionProperty(type=CADPatternPoint)
 
     # --- Create Gear Properties ---
-    gear_module: bpy.props.FloatProperty(name="Module", default=0.1, min=0.01)
-    gear_num_teeth: bpy.props.IntProperty(name="Number of Teeth", default=12, min=3)
-    gear_width: bpy.props.FloatProperty(name="Width", default=0.2, min=0.001, subtype='DISTANCE')
+    gear_module: bpy.props.FloatProperty(name="Module", default=0.1, min=0.01, update=update_feature_parameter)
+    gear_num_teeth: bpy.props.IntProperty(name="Number of Teeth", default=12, min=3, update=update_feature_parameter)
+    gear_width: bpy.props.FloatProperty(name="Width", default=0.2, min=0.001, subtype='DISTANCE', update=update_feature_parameter)
+    gear_flank_samples: bpy.props.IntProperty(name="Flank Samples", default=8, min=2, max=256, update=update_feature_parameter)
 
 
 class ExtrudeFeature(CADFeature):
     """Properties for an extrude feature."""
-    extrude_depth: bpy.props.FloatProperty(name="Depth", default=1.0, subtype='DISTANCE')
+    extrude_depth: bpy.props.FloatProperty(name="Depth", default=1.0, subtype='DISTANCE', update=update_feature_parameter)
 
 class BevelFeature(CADFeature):
     """Properties for a bevel feature."""
-    bevel_amount: bpy.props.FloatProperty(name="Amount", default=0.2, subtype='DISTANCE')
-    bevel_segments: bpy.props.IntProperty(name="Segments", default=4, min=1)
+    bevel_amount: bpy.props.FloatProperty(name="Amount", default=0.2, subtype='DISTANCE', update=update_feature_parameter)
+    bevel_segments: bpy.props.IntProperty(name="Segments", default=4, min=1, update=update_feature_parameter)
 
 
 class ObjectCADSettings(bpy.types.PropertyGroup):
     """Stores object-specific settings for the CAD addon, primarily the feature tree."""
     feature_tree: bpy.props.CollectionProperty(type=CADFeature)
+    base_mesh: bpy.props.PointerProperty(name="Base Mesh", type=bpy.types.Mesh, description="Geometry the feature tree is replayed onto when regenerating")
     active_feature_index: bpy.props.IntProperty()
+    regenerate_error: bpy.props.StringProperty(name="Regeneration Error", description="Why the last automatic rebuild failed; empty once a rebuild succeeds")
     expand_feature_tree: bpy.props.BoolProperty(default=True)
 
 class SceneCADSettings(bpy.types.PropertyGroup):
@@ -142,6 +192,7 @@ class SceneCADSettings(bpy.types.PropertyGroup):
     expand_units_and_grid: bpy.props.BoolProperty(default=False)
     expand_2d_sketching: bpy.props.BoolProperty(default=False)
     expand_3d_operations: bpy.props.BoolProperty(default=False)
+    expand_profiling: bpy.props.BoolProperty(default=False)
 
     pan_x: bpy.props.FloatProperty(name="Pan Left/Right", default=0.0, update=update_view_pan)
     pan_y: bpy.props.FloatProperty(name="Pan Up/Down", default=0.0, update=update_view_pan)
@@ -159,6 +210,12 @@ class SceneCADSettings(bpy.types.PropertyGroup):
     show_grid_dimensions: bpy.props.BoolProperty(name="Show Dimensions", default=False, description="Display grid scale markings in the viewport", update=update_units_and_grid)
     grid_dimension_font_size: bpy.props.IntProperty(name="Font Size", default=12, min=8, max=72, description="Font size for the grid dimensions", update=update_units_and_grid)
     grid_dimension_color: bpy.props.FloatVectorProperty(name="Color", subtype='COLOR', default=(1.0, 1.0, 1.0), min=0.0, max=1.0, description="Color for the grid dimensions", update=update_units_and_grid)
+    grid_dimension_max_labels: bpy.props.IntProperty(name="Max Labels", default=20, min=2, max=200, description="Maximum number of grid dimensions drawn along each axis; labels are thinned out when zoomed out", update=update_units_and_grid)
+
+    hole_chord_tolerance: bpy.props.FloatProperty(name="Hole Tolerance", default=0.00002, min=0.000001, max=0.01, precision=6, subtype='DISTANCE', description="Maximum distance between a hole's facets and the true circle; sets the segment count of every hole cutter from its radius")
+    sketch_frame_budget_ms: bpy.props.FloatProperty(name="Frame Budget", default=8.0, min=1.0, max=100.0, precision=1, description="Milliseconds the sketch tools may spend updating the preview per frame; vertex snapping that does not fit is refined over the following frames")
+    profiling_enabled: bpy.props.BoolProperty(name="Record Timings", default=False, description="Time every CAD Tools operator and the grid dimension overlay; costs nothing while off", update=update_profiling_enabled)
+    checkpoint_memory_mb: bpy.props.IntProperty(name="Checkpoint Memory", default=256, min=16, max=65536, description="Memory budget in MB for the per-feature geometry kept to speed up regeneration", update=update_checkpoint_budget)
 
     show_ref_sketches: bpy.props.BoolProperty(name="Show/Hide Sketches", default=True, update=update_ref_image_visibility)
     top_image: bpy.props.PointerProperty(type=ReferenceImageSettings)
@@ -171,6 +228,7 @@ class SceneCADSettings(bpy.types.PropertyGroup):
 
 classes = (
     ReferenceImageSettings,
+    CADPatternPoint,
     CADFeature,
     ExtrudeFeature,
     BevelFeature,
@@ -1,8 +1,18 @@
 import bpy
 import blf
 import gpu
+import math
+import numpy as np
 from mathutils import Vector
 from bpy_extras.view3d_utils import region_2d_to_location_3d
+from ..utils import project_points_to_region
+from .. import profiling
+
+# Labels drawn on the last redraw of each region, reused until their key changes.
+_label_cache = {} # region pointer -> (cache key, [(x, y, text), ...])
+# Formatted label strings, keyed by (value, unit settings key); cleared when it grows too large.
+_label_text_cache = {}
+_LABEL_TEXT_CACHE_SIZE = 4096
 
 def get_view_orientation(context):
     """Returns the orientation of the 3D view, e.g., 'TOP', 'FRONT', 'PERSP', etc."""
@@ -28,6 +38,71 @@ def get_view_orientation(context):
 
     return 'PERSP' # If not aligned with any axis, assume perspective/user view
 
+def _unit_settings_key(unit_settings):
+    """Returns a hashable snapshot of the unit settings that affect label text."""
+    return (unit_settings.system, unit_settings.length_unit, unit_settings.scale_length, unit_settings.use_separate)
+
+def _format_length(value, unit_settings, units_key):
+    """Formats a grid position, reusing previously formatted strings."""
+    cache_key = (value, units_key)
+    text = _label_text_cache.get(cache_key)
+    if text is None:
+        if len(_label_text_cache) >= _LABEL_TEXT_CACHE_SIZE:
+            _label_text_cache.clear()
+        text = _label_text_cache[cache_key] = bpy.utils.units.to_string_pretty(value, unit_settings)
+    return text
+
+def _label_step(span, grid_scale, max_labels):
+    """Returns how many grid lines apart labels are drawn (1, 2, 5, 10, 20, ...) so at most max_labels fit in span."""
+    raw = span / grid_scale / max_labels
+    if raw <= 1.0:
+        return 1
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 5, 10):
+        if multiple * magnitude >= raw:
+            return int(multiple * magnitude)
+    return int(10 * magnitude)
+
+def _visible_grid_positions(lo, hi, grid_scale, max_labels):
+    """Returns the labelled grid positions between lo and hi, excluding the origin."""
+    step = _label_step(hi - lo, grid_scale, max_labels)
+    first = math.ceil(lo / (grid_scale * step)) * step
+    last = math.floor(hi / (grid_scale * step)) * step
+    indices = np.arange(first, last + 1, step, dtype=np.int64)
+    indices = indices[indices != 0]
+    return indices * grid_scale
+
+def _build_labels(context, region, region_3d, grid_scale, x_axis, y_axis, units_key, max_labels):
+    """Projects the label anchors, culls those outside the region and formats the rest."""
+    # The view is orthographic and axis-aligned, so the two region corners bound what is visible.
+    corners = [
+        region_2d_to_location_3d(region, region_3d, corner, region_3d.view_location)
+        for corner in ((0, 0), (region.width, region.height))
+    ]
+    x_values = _visible_grid_positions(
+        min(c[x_axis] for c in corners), max(c[x_axis] for c in corners), grid_scale, max_labels)
+    y_values = _visible_grid_positions(
+        min(c[y_axis] for c in corners), max(c[y_axis] for c in corners), grid_scale, max_labels)
+
+    coords = np.zeros((len(x_values) + len(y_values), 3))
+    coords[:len(x_values), x_axis] = x_values
+    coords[len(x_values):, y_axis] = y_values
+    positions = np.concatenate((x_values, y_values))
+
+    points_2d, visible = project_points_to_region(region, region_3d, coords)
+    inside = (
+        visible
+        & (points_2d[:, 0] >= 0) & (points_2d[:, 0] <= region.width)
+        & (points_2d[:, 1] >= 0) & (points_2d[:, 1] <= region.height)
+    )
+
+    unit_settings = context.scene.unit_settings
+    labels = []
+    for (x, y), pos in zip(points_2d[inside].tolist(), positions[inside].tolist()):
+        labels.append((x, y, _format_length(pos, unit_settings, units_key)))
+    return labels
+
+@profiling.profiled
 def draw_grid_dimensions_callback(context):
     """Draws dimension labels on the grid in the 3D viewport."""
     settings = context.scene.scene_cad_settings
@@ -56,20 +131,9 @@ def draw_grid_dimensions_callback(context):
     region = context.region
     region_3d = space.region_3d
 
-    # Get visible range
-    view_center_3d = region_2d_to_location_3d(region, region_3d, region.width / 2, region.height / 2, region_3d.view_location)
-    zoom_factor = region_3d.view_distance * 0.2
-
     grid_scale = space.overlay.grid_scale
     if grid_scale <= 0: return
 
-    # --- Draw Labels ---
-    def draw_label(text, coord_3d):
-        coord_2d = bpy.context.region_data.view3d_to_region_2d(region, coord_3d, default=None)
-        if coord_2d is None: return
-        blf.position(font_id, coord_2d.x, coord_2d.y, 0)
-        blf.draw(font_id, text)
-
     # Determine which axes to label based on orientation
     if orientation in ['TOP', 'BOTTOM']:
         x_axis, y_axis = 0, 1
@@ -80,23 +144,23 @@ def draw_grid_dimensions_callback(context):
     else:
         return
 
-    # Draw labels along the horizontal axis
-    for i in range(-50, 51):
-        if i == 0: continue
-        pos = i * grid_scale
-        coord = Vector((0,0,0))
-        coord[x_axis] = pos
-        label_text = bpy.utils.units.to_string_pretty(pos, context.scene.unit_settings)
-        draw_label(label_text, coord)
-
-    # Draw labels along the vertical axis
-    for i in range(-50, 51):
-        if i == 0: continue
-        pos = i * grid_scale
-        coord = Vector((0,0,0))
-        coord[y_axis] = pos
-        label_text = bpy.utils.units.to_string_pretty(pos, context.scene.unit_settings)
-        draw_label(label_text, coord)
+    # --- Draw Labels ---
+    # Projection and unit formatting only happen when the view, grid or units change.
+    units_key = _unit_settings_key(context.scene.unit_settings)
+    max_labels = settings.grid_dimension_max_labels
+    cache_key = (
+        grid_scale, units_key, orientation, max_labels, region.width, region.height,
+        tuple(tuple(row) for row in region_3d.perspective_matrix),
+    )
+    cached = _label_cache.get(region.as_pointer())
+    if cached is None or cached[0] != cache_key:
+        with profiling.phase("build_labels"):
+            cached = (cache_key, _build_labels(context, region, region_3d, grid_scale, x_axis, y_axis, units_key, max_labels))
+        _label_cache[region.as_pointer()] = cached
+
+    for x, y, text in cached[1]:
+        blf.position(font_id, x, y, 0)
+        blf.draw(font_id, text)
 
 
 # --- Registration ---
@@ -116,3 +180,5 @@ def unregister():
     if draw_handler is not None:
         bpy.types.SpaceView3D.draw_handler_remove(draw_handler, 'WINDOW')
         draw_handler = None
+    _label_cache.clear()
+    _label_text_cache.clear()
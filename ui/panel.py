@@ -11,11 +11,15 @@ from ..operators.sketch_tools import (
 )
 from ..operators.op_3d import (
     MESH_OT_simple_extrude, MESH_OT_bevel_edges,
-    MESH_OT_create_hole, MESH_OT_create_gear, MESH_OT_inner_radius
+    MESH_OT_create_hole, MESH_OT_create_hole_pattern, MESH_OT_create_gear, MESH_OT_create_gear_train,
+    MESH_OT_inner_radius
 )
 from ..operators.reference_manager import IMAGE_OT_load_reference, IMAGE_OT_clear_reference
+from ..operators.profile_ops import WM_OT_cad_export_profile, WM_OT_cad_clear_profile
+from .. import profiling
 from ..operators.feature_manager import (
-    OBJECT_OT_add_feature, OBJECT_OT_remove_feature, OBJECT_OT_move_feature
+    OBJECT_OT_add_feature, OBJECT_OT_remove_feature, OBJECT_OT_move_feature,
+    OBJECT_OT_regenerate_features
 )
 
 # --- IMPORTANT: Assume SceneCADSettings and other PropertyGroups are defined and registered in properties.py ---
@@ -79,6 +83,9 @@ class OBJECT_UL_feature_tree(bpy.types.UIList):
                 op_icon = 'MOD_BEVEL'
 
             layout.label(text=feature.name, icon=op_icon)
+            if feature.is_dirty:
+                # Waiting for the debounced rebuild, see operators/regeneration.py
+                layout.label(text="", icon='FILE_REFRESH')
 
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
@@ -92,6 +99,9 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
     bl_region_type = 'UI'
     bl_category = 'CAD Tools'
 
+    # Number of phases listed in the Profiling section, most total time first
+    profiling_rows = 8
+
     def _draw_ref_image_ui(self, layout, scene_settings, view_name, view_type):
         """Helper function to draw the UI for a single reference image view."""
         # Ensure image_settings is accessible and has a 'filepath' property
@@ -138,6 +148,8 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
                         obj_settings,          # active_data: the property group containing the active index
                         "active_feature_index" # active_property_name: the name of the active index property
                     )
+                    if obj_settings.regenerate_error:
+                        ft_box.label(text=obj_settings.regenerate_error, icon='ERROR')
                     # Add/Remove/Move Buttons
                     row = ft_box.row(align=True)
                     row.operator(OBJECT_OT_add_feature.bl_idname, text="Add", icon='ADD').feature_type = 'EXTRUDE'
@@ -147,6 +159,9 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
                     move_up_op.direction = 'UP'
                     move_down_op = col.operator(OBJECT_OT_move_feature.bl_idname, text="", icon='TRIA_DOWN')
                     move_down_op.direction = 'DOWN'
+                    row = ft_box.row(align=True)
+                    row.operator(OBJECT_OT_regenerate_features.bl_idname, icon='FILE_REFRESH')
+                    row.prop(scene_settings, "checkpoint_memory_mb", text="Cache MB")
 
                     # --- Feature Properties ---
                     if obj_settings.feature_tree and obj_settings.active_feature_index >= 0:
@@ -155,9 +170,11 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
                         props_box.label(text=f"Properties: {active_feature.name}")
                         if active_feature.type == 'EXTRUDE':
                             props_box.prop(active_feature, "extrude_depth")
+                            props_box.prop(active_feature, "selection_mode")
                         elif active_feature.type == 'BEVEL':
                             props_box.prop(active_feature, "bevel_amount")
                             props_box.prop(active_feature, "bevel_segments")
+                            props_box.prop(active_feature, "selection_mode")
                         elif active_feature.type == 'INNER_RADIUS':
                             props_box.prop(active_feature, "inner_radius_width")
                             props_box.prop(active_feature, "inner_radius_length")
@@ -175,10 +192,34 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
                                 props_box.prop(active_feature, "hole_cb_depth")
                             elif active_feature.hole_type == 'COUNTERSINK':
                                 props_box.prop(active_feature, "hole_cs_angle")
+                        elif active_feature.type == 'HOLE_PATTERN':
+                            props_box.prop(active_feature, "hole_type")
+                            props_box.prop(active_feature, "hole_diameter")
+                            props_box.prop(active_feature, "hole_depth")
+                            if active_feature.hole_type == 'COUNTERBORE':
+                                props_box.prop(active_feature, "hole_cb_diameter")
+                                props_box.prop(active_feature, "hole_cb_depth")
+                            elif active_feature.hole_type == 'COUNTERSINK':
+                                props_box.prop(active_feature, "hole_cs_angle")
+                            props_box.prop(active_feature, "pattern_type")
+                            if active_feature.pattern_type == 'POINTS':
+                                props_box.label(text=f"{len(active_feature.pattern_points)} points")
+                            else:
+                                props_box.prop(active_feature, "pattern_count_x")
+                            if active_feature.pattern_type == 'RECTANGULAR':
+                                props_box.prop(active_feature, "pattern_count_y")
+                            if active_feature.pattern_type in {'LINEAR', 'RECTANGULAR'}:
+                                props_box.prop(active_feature, "pattern_spacing_x")
+                            if active_feature.pattern_type == 'RECTANGULAR':
+                                props_box.prop(active_feature, "pattern_spacing_y")
+                            if active_feature.pattern_type == 'POLAR':
+                                props_box.prop(active_feature, "pattern_radius")
+                                props_box.prop(active_feature, "pattern_start_angle")
                         elif active_feature.type == 'CREATE_GEAR':
                             props_box.prop(active_feature, "gear_module")
                             props_box.prop(active_feature, "gear_num_teeth")
                             props_box.prop(active_feature, "gear_width")
+                            props_box.prop(active_feature, "gear_flank_samples")
         
         # --- View Navigator Section ---
         view_box = layout.box()
@@ -229,6 +270,7 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
                 col.use_property_split = True
                 col.prop(scene_settings, "grid_dimension_font_size", text="Font Size")
                 col.prop(scene_settings, "grid_dimension_color", text="Color")
+                col.prop(scene_settings, "grid_dimension_max_labels", text="Max Labels")
 
         # --- 2D Sketching Section ---
         sketch_box = layout.box()
@@ -246,6 +288,7 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
             col = sketch_box.column(align=True)
             col.prop(scene_settings, "use_grid_snap")
             col.prop(scene_settings, "use_vertex_snap")
+            col.prop(scene_settings, "sketch_frame_budget_ms", text="Frame Budget (ms)")
             # --- New: Auto Fill Closed Shapes option ---
             col.prop(scene_settings, "use_fill")
 
@@ -258,8 +301,30 @@ class VIEW3D_PT_cad_tools(bpy.types.Panel):
             op_box.operator(MESH_OT_bevel_edges.bl_idname, text="Bevel", icon='MOD_BEVEL')
             op_box.separator()
             op_box.operator(MESH_OT_create_hole.bl_idname, text="Hole Tool", icon='MESH_CYLINDER')
+            op_box.operator(MESH_OT_create_hole_pattern.bl_idname, text="Hole Pattern", icon='MOD_ARRAY')
+            op_box.prop(scene_settings, "hole_chord_tolerance", text="Hole Tolerance")
             op_box.operator(MESH_OT_inner_radius.bl_idname, text="Inner Radius", icon='MESH_TORUS')
             op_box.operator(MESH_OT_create_gear.bl_idname, text="Spur Gear", icon='MOD_ARRAY')
+            op_box.operator(MESH_OT_create_gear_train.bl_idname, text="Gear Train", icon='MOD_ARRAY')
+
+        # --- Profiling Section ---
+        prof_box = layout.box()
+        prof_box.prop(scene_settings, "expand_profiling", text="Profiling", icon='TIME')
+        if scene_settings.expand_profiling:
+            prof_box.prop(scene_settings, "profiling_enabled")
+            rows = profiling.summary()[:self.profiling_rows]
+            if rows:
+                col = prof_box.column(align=True)
+                row = col.row()
+                row.label(text="Phase")
+                row.label(text="p50 / p95 ms")
+                for entry in rows:
+                    row = col.row()
+                    row.label(text=entry["label"])
+                    row.label(text=f"{entry['p50_ms']:.2f} / {entry['p95_ms']:.2f}  ({entry['count']})")
+            row = prof_box.row(align=True)
+            row.operator(WM_OT_cad_export_profile.bl_idname, text="Export", icon='EXPORT')
+            row.operator(WM_OT_cad_clear_profile.bl_idname, text="Clear", icon='TRASH')
 
 
 classes = (
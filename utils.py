@@ -2,6 +2,8 @@
 import bpy
 import blf
 import math
+import numpy as np
+from functools import lru_cache
 from mathutils import Vector
 from mathutils.geometry import intersect_line_plane
 from gpu_extras.batch import batch_for_shader
@@ -17,20 +19,110 @@ def mouse_to_plane_coord(context, event, plane_co=(0, 0, 0), plane_no=(0, 0, 1))
     intersection_point = intersect_line_plane(ray_origin, ray_origin + ray_vector, plane_co, plane_no)
     return intersection_point
 
-def draw_circle_3d(position, radius, normal, segments=32):
-    """ Helper function to generate vertices for a 3D circle for drawing. """
-    coords = []
-    if normal.length == 0: return coords
-    
-    q = Vector((0,0,1)).rotation_difference(normal)
-    
-    for i in range(segments + 1):
-        angle = (i / segments) * 2 * math.pi
-        v = Vector((math.cos(angle) * radius, math.sin(angle) * radius, 0))
-        v.rotate(q)
-        coords.append(position + v)
+def mesh_vertex_coords(mesh):
+    """ Reads all vertex coordinates of a mesh into an (N, 3) float32 array with foreach_get. """
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def project_points_to_region(region, rv3d, coords, matrix_world=None):
+    """ Batched equivalent of location_3d_to_region_2d for an (N, 3) array of points.
+
+    The optional object matrix is folded into the view's perspective matrix so
+    the whole set is projected with a single matrix multiply. Returns the
+    (N, 2) region coordinates and a boolean mask that is False for points
+    behind the viewer (where location_3d_to_region_2d would return None).
+    """
+    matrix = np.array(rv3d.perspective_matrix, dtype=np.float64)
+    if matrix_world is not None:
+        matrix = matrix @ np.array(matrix_world, dtype=np.float64)
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    prj = coords @ matrix[:, :3].T + matrix[:, 3]
+    visible = prj[:, 3] > 0.0
+    w = np.where(visible, prj[:, 3], 1.0)
+    half = np.array((region.width / 2, region.height / 2))
+    points_2d = half + half * (prj[:, :2] / w[:, None])
+    return points_2d, visible
+
+def nearest_point_in_region(points_2d, x, y, threshold_px, visible=None):
+    """ Returns the index of the projected point closest to (x, y) within threshold_px, or None. """
+    if len(points_2d) == 0:
+        return None
+    delta = points_2d - (x, y)
+    dist_sq = np.einsum('ij,ij->i', delta, delta)
+    if visible is not None:
+        dist_sq[~visible] = np.inf
+    index = int(np.argmin(dist_sq))
+    if dist_sq[index] >= threshold_px**2:
+        return None
+    return index
+
+@lru_cache(maxsize=64)
+def unit_circle(segments):
+    """ Returns a read-only (segments + 1, 3) float32 closed loop on the unit circle in the XY plane.
+
+    Tables are computed once per segment count and shared by every caller.
+    """
+    angles = np.linspace(0.0, 2 * math.pi, segments + 1)
+    coords = np.zeros((segments + 1, 3), dtype=np.float32)
+    coords[:, 0] = np.cos(angles)
+    coords[:, 1] = np.sin(angles)
+    coords[-1] = coords[0] # Close the loop exactly
+    coords.setflags(write=False)
+    return coords
+
+def _normal_rotation(normal):
+    """ Returns the 3x3 float32 rotation taking +Z to normal, or None for a zero normal. """
+    normal = Vector(normal)
+    if normal.length == 0:
+        return None
+    return np.array(Vector((0, 0, 1)).rotation_difference(normal).to_matrix(), dtype=np.float32)
+
+def circle_coords(position, radius, normal=(0, 0, 1), segments=32):
+    """ Returns a contiguous (segments + 1, 3) float32 LINE_STRIP loop around position, facing normal. """
+    rotation = _normal_rotation(normal)
+    if rotation is None:
+        return np.empty((0, 3), dtype=np.float32)
+    coords = unit_circle(segments) @ (rotation.T * np.float32(radius))
+    coords += np.asarray(position, dtype=np.float32)
+    return coords
+
+def circles_coords(positions, radii, normal=(0, 0, 1), segments=32):
+    """ Returns a contiguous float32 'LINES' array drawing one circle per position.
+
+    radii is a single radius or one per position. All circles share the
+    normal, so the whole set is a single broadcast multiply-add and can go
+    into one batch_for_shader call.
+    """
+    rotation = _normal_rotation(normal)
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    if rotation is None or not len(positions):
+        return np.empty((0, 3), dtype=np.float32)
+    loop = unit_circle(segments) @ rotation.T
+    # Consecutive loop points as line pairs: (segments * 2, 3)
+    pairs = np.stack((loop[:-1], loop[1:]), axis=1).reshape(-1, 3)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), (len(positions),))
+    coords = pairs[None, :, :] * radii[:, None, None] + positions[:, None, :]
+    return np.ascontiguousarray(coords.reshape(-1, 3))
+
+def arc_coords(position, radius, start_angle, end_angle, normal=(0, 0, 1), segments=32):
+    """ Returns a (segments + 1, 3) float32 LINE_STRIP from start_angle to end_angle (radians, about normal). """
+    rotation = _normal_rotation(normal)
+    if rotation is None:
+        return np.empty((0, 3), dtype=np.float32)
+    angles = np.linspace(start_angle, end_angle, segments + 1)
+    local = np.column_stack((np.cos(angles), np.sin(angles), np.zeros_like(angles))).astype(np.float32)
+    coords = local @ (rotation.T * np.float32(radius))
+    coords += np.asarray(position, dtype=np.float32)
     return coords
 
+def draw_circle_3d(position, radius, normal, segments=32):
+    """ Helper function to generate vertices for a 3D circle for drawing.
+
+    Returns a (segments + 1, 3) float32 array, see circle_coords().
+    """
+    return circle_coords(position, radius, normal, segments)
+
 def draw_text_2d(x, y, text, size=14, color=(1.0, 1.0, 1.0, 1.0)):
     """ Draws text in the 2D region of the viewport. """
     font_id = 0